@@ -1,7 +1,15 @@
 # -*- coding: utf-8 -*-
-import pkg_resources
 
-try:
-    __version__ = pkg_resources.get_distribution(__name__).version
-except:
-    __version__ = 'unknown'
+
+def __getattr__(name):
+    # resolved on first use, looking up the distribution costs more than
+    # importing the solvers themselves
+    global __version__
+    if name != '__version__':
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    try:
+        from importlib.metadata import version
+        __version__ = version(__name__)
+    except Exception:
+        __version__ = 'unknown'
+    return __version__
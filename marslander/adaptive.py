@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Adaptive control of a running genetic search.
+
+The solvers breed every generation with their module constants
+``POPULATION_SIZE`` and ``MUTATION_CHANCE`` and run until the generation
+count or the deadline is reached. Pass an :class:`AdaptiveController` as
+``controller`` to a solver's ``evolve`` (or ``plan``) and it is updated
+after every evaluated generation with the fitness values and whether the
+best chromosome lands. It tracks
+
+- stagnation: generations since the best fitness last improved,
+- diversity: the population standard deviation of the fitness values that
+  :mod:`marslander.convergence` records, divided by the magnitude of their
+  mean so it does not depend on the scale of the fitness,
+
+and sets the parameters of the next generation:
+
+- a stalled or converged search raises the mutation chance, replaces a
+  share of the children with random immigrants and grows the population,
+- an improving search relaxes the mutation chance back to its base value
+  and shrinks the population, so generations are cheaper while it
+  exploits,
+- once the best chromosome has landed and not improved for ``stable``
+  generations, ``stop`` ends the search early.
+"""
+from __future__ import division, print_function, absolute_import
+
+import math
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def relative_diversity(fitness_array):
+    """float: population standard deviation of ``fitness_array`` divided by ``max(abs(mean), 1)``"""
+    values = [float(value) for value in fitness_array]
+    mean = sum(values) / len(values)
+    deviation = math.sqrt(sum((value - mean) ** 2 for value in values) / len(values))
+    return deviation / max(abs(mean), 1.)
+
+
+class AdaptiveController(object):
+    """Mutation chance, population size, immigrants and stopping of a search
+
+    Args:
+      mutation_chance (float): base mutation chance, the solver's
+        ``MUTATION_CHANCE``
+      population_size (int): initial population size, the solver's
+        ``POPULATION_SIZE``
+      min_population (int): smallest population, defaults to half of
+        ``population_size``
+      max_population (int): largest population, defaults to twice
+        ``population_size``
+      population_step (int): even number of chromosomes the population
+        grows or shrinks by per generation
+      max_mutation_chance (float): mutation chance ceiling
+      mutation_growth (float): factor the mutation chance is raised or
+        relaxed by per generation
+      immigrant_share (float): share of the population replaced by random
+        immigrants while the search stalls
+      stagnation (int): generations without improvement after which the
+        search stalls
+      diversity_floor (float): relative diversity (see
+        :func:`relative_diversity`) under which the population has
+        converged
+      stable (int): generations a landing best has to stay unimproved to
+        stop the search
+      tolerance (float): smallest fitness gain counted as an improvement
+
+    Attributes:
+      mutation_chance (float): mutation chance of the next generation
+      population_size (int): size of the next generation
+      immigrants (int): random chromosomes in the next generation
+      stop (bool): the search may end
+      stagnant (int): generations since the best fitness improved
+      diversity (float): relative diversity of the last generation
+    """
+
+    def __init__(self, mutation_chance, population_size, min_population=None, max_population=None,
+                 population_step=4, max_mutation_chance=0.05, mutation_growth=2., immigrant_share=0.2, stagnation=5,
+                 diversity_floor=0.05, stable=10, tolerance=1e-6):
+        assert population_step > 0 and population_step % 2 == 0
+        self.base_mutation_chance = mutation_chance
+        self.min_population = min_population or max(population_size // 2 // 2 * 2, 4)
+        self.max_population = max_population or 2 * population_size
+        assert self.min_population <= population_size <= self.max_population
+        self.population_step = population_step
+        self.max_mutation_chance = max_mutation_chance
+        self.mutation_growth = mutation_growth
+        self.immigrant_share = immigrant_share
+        self.stagnation = stagnation
+        self.diversity_floor = diversity_floor
+        self.stable = stable
+        self.tolerance = tolerance
+
+        self.mutation_chance = mutation_chance
+        self.population_size = population_size
+        self.immigrants = 0
+        self.stop = False
+        self.stagnant = 0
+        self.diversity = None
+        self.best = None
+
+    def update(self, generation, fitness_array, landed=False):
+        """Adapt to an evaluated generation
+
+        Args:
+          generation (int): index of the generation
+          fitness_array: fitness values of its population
+          landed (bool): the best chromosome found so far lands
+        """
+        best = max(float(value) for value in fitness_array)
+        improved = self.best is None or best > self.best + self.tolerance
+        if improved:
+            self.best = best
+            self.stagnant = 0
+        else:
+            self.stagnant += 1
+        self.diversity = relative_diversity(fitness_array)
+
+        if self.stagnant >= self.stagnation or self.diversity < self.diversity_floor:
+            self.mutation_chance = min(self.mutation_chance * self.mutation_growth, self.max_mutation_chance)
+            self.population_size = min(self.population_size + self.population_step, self.max_population)
+            self.immigrants = int(self.immigrant_share * self.population_size)
+        else:
+            self.mutation_chance = max(self.mutation_chance / self.mutation_growth, self.base_mutation_chance)
+            if improved:
+                self.population_size = max(self.population_size - self.population_step, self.min_population)
+            self.immigrants = 0
+        self.stop = landed and self.stagnant >= self.stable
+
+    def __repr__(self):
+        return 'AdaptiveController(mutation_chance={:.4f}, population_size={}, immigrants={}, stagnant={})'.format(
+            self.mutation_chance, self.population_size, self.immigrants, self.stagnant)
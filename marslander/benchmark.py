@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Microbenchmarks of the solver hot paths on the canned scenarios.
+
+For every solver and scenario of :mod:`marslander.scenarios` it measures
+
+- ``steps``: simulated steps per second of ``calculate_trajectory``,
+- ``fitness``: evaluations per second of the scalar ``fitness``,
+- ``evaluate_population``: evaluations per second of a whole population,
+- ``generations``: generations per second of ``get_best_trajectory``,
+- ``breed``: children per second of ``breed``.
+
+and once per solver, in fresh interpreters,
+
+- ``import``: imports per second of the solver module, the inverse of the
+  fastest import time, also recording whether the import loaded NumPy.
+
+Each benchmark repeats its call until ``--duration`` seconds have passed
+and every run is seeded, so two commits are compared by running
+
+    python -m marslander.benchmark -o before.json
+    python -m marslander.benchmark -o after.json --compare before.json
+
+``--profile FILE`` saves a cProfile profile of the run for ``pstats`` and
+``--memory`` prints the largest allocations traced by tracemalloc.
+"""
+from __future__ import division, print_function, absolute_import
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import importlib
+import itertools
+import subprocess
+from time import perf_counter
+
+from marslander import __version__
+from marslander import scenarios
+from marslander.metrics import capture
+from marslander.rng import SolverRandom
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+_logger = logging.getLogger(__name__)
+
+SOLVERS = {
+    'marslander1': ('marslander.marslander1.solution', scenarios.marslander1_arguments),
+    'marslander2': ('marslander.marslander2.solution', scenarios.marslander2_arguments),
+}
+
+
+def measure(call, duration):
+    """Repeat ``call`` for at least ``duration`` seconds, at least once
+
+    Args:
+      call: function returning the units of work it has done
+      duration (float): seconds to keep repeating
+
+    Returns:
+      tuple: (units, seconds, calls)
+    """
+    units = calls = 0
+    started = perf_counter()
+    while True:
+        units += call()
+        calls += 1
+        elapsed = perf_counter() - started
+        if elapsed >= duration:
+            return units, elapsed, calls
+
+
+def bench_steps(solver, arguments, rng, duration):
+    chromosomes = itertools.cycle(solver.random_population(rng))
+    return measure(lambda: len(solver.calculate_trajectory(*arguments, next(chromosomes))) - 1, duration)
+
+
+def bench_fitness(solver, arguments, rng, duration):
+    chromosomes = itertools.cycle(solver.random_population(rng))
+
+    def call():
+        solver.fitness(*arguments, next(chromosomes))
+        return 1
+    return measure(call, duration)
+
+
+def bench_evaluate_population(solver, arguments, rng, duration):
+    population = solver.random_population(rng)
+    return measure(lambda: len(solver.evaluate_population(*arguments, population)), duration)
+
+
+def bench_generations(solver, arguments, rng, duration):
+    def call():
+        solver.get_best_trajectory(*arguments, rng=rng)
+        return solver.GENERATION_COUNT + 1
+    return measure(call, duration)
+
+
+def bench_breed(solver, arguments, rng, duration):
+    population = solver.random_population(rng)
+    fitness_array = [rng.uniform(0, 100) for _ in range(len(population))]
+    return measure(lambda: len(solver.breed(population, fitness_array, rng=rng)[0]), duration)
+
+
+_IMPORT_CODE = '''
+import sys, json
+from time import perf_counter
+started = perf_counter()
+import {}
+print(json.dumps({{'seconds': perf_counter() - started, 'numpy': 'numpy' in sys.modules}}))
+'''
+
+
+def measure_import(module_name, repeat=5):
+    """Time the import of ``module_name`` in ``repeat`` fresh interpreters
+
+    Returns:
+      tuple: (fastest import seconds, whether the import loaded NumPy)
+    """
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', _IMPORT_CODE.format(module_name)])
+        timings.append(json.loads(output.decode()))
+    return min(timing['seconds'] for timing in timings), any(timing['numpy'] for timing in timings)
+
+
+BENCHMARKS = (
+    ('steps', bench_steps, 'steps/s'),
+    ('fitness', bench_fitness, 'evaluations/s'),
+    ('evaluate_population', bench_evaluate_population, 'evaluations/s'),
+    ('generations', bench_generations, 'generations/s'),
+    ('breed', bench_breed, 'children/s'),
+)
+
+STARTUP_BENCHMARKS = ('import',)
+
+
+def run_benchmarks(solvers=None, scenario_names=None, benchmarks=None, duration=1., seed=0):
+    """Run the selected benchmarks
+
+    Args:
+      solvers: names from ``SOLVERS``, all by default
+      scenario_names: names from :data:`marslander.scenarios.SCENARIOS`,
+        all by default
+      benchmarks: names from ``BENCHMARKS``, all by default
+      duration (float): seconds spent in every benchmark
+      seed (int): seed of every benchmark's random stream
+
+    Returns:
+      list: one dict per (solver, scenario, benchmark) measurement, the
+      scenario of the ``import`` benchmark is ``-``
+    """
+    results = []
+    for solver_name in solvers or sorted(SOLVERS):
+        module_name, to_arguments = SOLVERS[solver_name]
+        if not benchmarks or 'import' in benchmarks:
+            seconds, numpy_loaded = measure_import(module_name)
+            results.append({'solver': solver_name, 'scenario': '-', 'benchmark': 'import', 'unit': 'imports/s',
+                            'units': 1, 'calls': 1, 'seconds': seconds, 'rate': 1 / seconds, 'numpy': numpy_loaded})
+            _logger.info('%s import: %.4f s, numpy %s', solver_name, seconds,
+                         'loaded' if numpy_loaded else 'not loaded')
+        solver = importlib.import_module(module_name)
+        for scenario_name in scenario_names or sorted(scenarios.SCENARIOS):
+            arguments = to_arguments(scenarios.SCENARIOS[scenario_name])
+            for name, benchmark, unit in BENCHMARKS:
+                if benchmarks and name not in benchmarks:
+                    continue
+                units, seconds, calls = benchmark(solver, arguments, SolverRandom(seed), duration)
+                result = {'solver': solver_name, 'scenario': scenario_name, 'benchmark': name, 'unit': unit,
+                          'units': units, 'calls': calls, 'seconds': seconds, 'rate': units / seconds}
+                _logger.info('%s %s %s: %.1f %s', solver_name, scenario_name, name, result['rate'], unit)
+                results.append(result)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """dict: description of the machine and code the results come from"""
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'version': __version__,
+            'commit': _git_commit(), 'python': platform.python_version(), 'numpy': numpy_version,
+            'platform': platform.platform(), 'processor': platform.processor()}
+
+
+def compare(baseline, results):
+    """Rate ratios of ``results`` against the ``baseline`` results
+
+    Returns:
+      list: (solver, scenario, benchmark, baseline rate, rate, speedup)
+      of the measurements present in both
+    """
+    def key(result):
+        return result['solver'], result['scenario'], result['benchmark']
+
+    baseline = {key(result): result['rate'] for result in baseline}
+    return [key(result) + (baseline[key(result)], result['rate'], result['rate'] / baseline[key(result)])
+            for result in results if baseline.get(key(result))]
+
+
+def parse_args(args):
+    """Parse command line parameters
+
+    Args:
+      args ([str]): command line parameters as list of strings
+
+    Returns:
+      :obj:`argparse.Namespace`: command line parameters namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the marslander solvers on canned scenarios")
+    parser.add_argument(
+        '--version',
+        action='version',
+        version='marslander {ver}'.format(ver=__version__))
+    parser.add_argument(
+        '--solver',
+        dest="solvers",
+        help="solver to benchmark, repeatable (default: all)",
+        action='append',
+        choices=sorted(SOLVERS))
+    parser.add_argument(
+        '--scenario',
+        dest="scenarios",
+        help="scenario to run, repeatable (default: all)",
+        action='append',
+        choices=sorted(scenarios.SCENARIOS))
+    parser.add_argument(
+        '--benchmark',
+        dest="benchmarks",
+        help="benchmark to run, repeatable (default: all)",
+        action='append',
+        choices=[name for name, _, _ in BENCHMARKS] + list(STARTUP_BENCHMARKS))
+    parser.add_argument(
+        '-d',
+        '--duration',
+        help="seconds spent in every benchmark (default: %(default)s)",
+        type=float,
+        default=1.)
+    parser.add_argument(
+        '--seed',
+        help="random seed (default: %(default)s)",
+        type=int,
+        default=0)
+    parser.add_argument(
+        '-o',
+        '--output',
+        help="JSON file to write the results to",
+        metavar="FILE")
+    parser.add_argument(
+        '--compare',
+        help="JSON results of an earlier run to compare against",
+        metavar="FILE")
+    parser.add_argument(
+        '--profile',
+        help="write a cProfile profile of the run to FILE",
+        metavar="FILE")
+    parser.add_argument(
+        '--memory',
+        help="trace allocations and print the largest ones",
+        action='store_true')
+    parser.add_argument(
+        '-v',
+        '--verbose',
+        dest="loglevel",
+        help="set loglevel to INFO",
+        action='store_const',
+        const=logging.INFO)
+    parser.add_argument(
+        '-vv',
+        '--very-verbose',
+        dest="loglevel",
+        help="set loglevel to DEBUG",
+        action='store_const',
+        const=logging.DEBUG)
+    return parser.parse_args(args)
+
+
+def setup_logging(loglevel):
+    """Setup basic logging
+
+    Args:
+      loglevel (int): minimum loglevel for emitting messages
+    """
+    logformat = "[%(asctime)s] %(levelname)s:%(name)s:%(message)s"
+    logging.basicConfig(level=loglevel, stream=sys.stdout,
+                        format=logformat, datefmt="%Y-%m-%d %H:%M:%S")
+
+
+def main(args):
+    """Main entry point allowing external calls
+
+    Args:
+      args ([str]): command line parameter list
+    """
+    args = parse_args(args)
+    setup_logging(args.loglevel)
+    with capture(profile=bool(args.profile), memory=args.memory) as captured:
+        results = run_benchmarks(args.solvers, args.scenarios, args.benchmarks, args.duration, args.seed)
+    if args.profile:
+        captured.profile.dump_stats(args.profile)
+    if args.memory:
+        captured.report(file=sys.stdout)
+    report = {'environment': environment(), 'duration': args.duration, 'seed': args.seed, 'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            rows = compare(json.load(baseline)['results'], results)
+        for solver, scenario, name, baseline_rate, rate, speedup in rows:
+            print('{:<12} {:<12} {:<20} {:>14.1f} {:>14.1f} {:>7.2f}x'.format(
+                solver, scenario, name, baseline_rate, rate, speedup))
+    else:
+        for result in results:
+            print('{solver:<12} {scenario:<12} {benchmark:<20} {rate:>14.1f} {unit}'.format(**result))
+
+
+def run():
+    """Entry point for console_scripts
+    """
+    main(sys.argv[1:])
+
+
+if __name__ == "__main__":
+    run()
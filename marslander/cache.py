@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Fitness memoization shared by the marslander solvers.
+
+Elites survive unchanged from one generation to the next and a low mutation
+chance breeds many duplicate chromosomes, so a chromosome evaluated once for
+a given initial state never needs to be simulated again.
+"""
+from __future__ import division, print_function, absolute_import
+
+from collections import OrderedDict
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+class FitnessCache(object):
+    """Size-bounded LRU mapping of (initial state, genome) keys to fitness
+
+    Args:
+      maxsize (int): number of entries kept before the least recently used
+        one is evicted
+    """
+
+    def __init__(self, maxsize=4096):
+        assert maxsize > 0
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def get(self, key, default=None):
+        """Look up ``key`` and count the hit or miss
+
+        Args:
+          key: hashable (initial state, genome) key
+          default: value returned on a miss
+
+        Returns:
+          cached fitness or ``default``
+        """
+        try:
+            value = self._values[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._values.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store ``value`` under ``key``, evicting the oldest entry when full
+
+        Args:
+          key: hashable (initial state, genome) key
+          value: fitness of the genome
+        """
+        self._values[key] = value
+        self._values.move_to_end(key)
+        if len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        self._values.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        """float: share of lookups answered without simulating"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.
+
+    def __repr__(self):
+        return 'FitnessCache(size={}/{}, hits={}, misses={})'.format(
+            len(self._values), self.maxsize, self.hits, self.misses)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Batch solver for many Mars Lander scenarios.
+
+Scenarios are given as canned scenario names, surface files in the game's
+input format (see :func:`marslander.referee.load_scenario`), directories of
+such ``.txt`` files, or manifests. A manifest is a ``.json`` list or a
+``.jsonl`` file of ``{"name": ..., "surface": [[x, y], ...], "state": [x, y,
+h_speed, v_speed, fuel, rotate, power]}`` objects.
+
+Every scenario is planned by a worker of a process pool within the time
+budget, and one JSON line is printed per scenario as soon as it finishes:
+
+    marslander terrains/ nightly.jsonl --solver marslander2 --workers 8
+
+The line holds the best genome, the simulated final state, fuel, fitness,
+wall time, generations and evaluations. A scenario that fails gets a line
+with its ``error`` instead. With ``--store FILE`` every search starts from
+the genomes a :class:`marslander.store.SolutionStore` kept for the scenario
+and leaves its fittest genomes there for the next sweep. With ``--adaptive``
+an :class:`marslander.adaptive.AdaptiveController` tunes every search and
+ends it once its landing is stable.
+"""
+from __future__ import division, print_function, absolute_import
+
+import os
+import sys
+import json
+import logging
+import argparse
+import importlib
+import multiprocessing
+from time import perf_counter
+
+from marslander import __version__
+from marslander import scenarios
+from marslander.adaptive import AdaptiveController
+from marslander.cache import FitnessCache
+from marslander.metrics import Metrics
+from marslander.parallel import available_cpus
+from marslander.referee import SOLVERS, load_scenario
+from marslander.rng import SolverRandom
+from marslander.store import SolutionStore
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+_logger = logging.getLogger(__name__)
+
+ARGUMENTS = {
+    'marslander1': scenarios.marslander1_arguments,
+    'marslander2': scenarios.marslander2_arguments,
+}
+
+
+def _manifest_scenarios(path):
+    with open(path) as manifest:
+        if path.endswith('.jsonl'):
+            entries = [json.loads(line) for line in manifest if line.strip()]
+        else:
+            entries = json.load(manifest)
+    default_name = os.path.splitext(os.path.basename(path))[0]
+    return [scenarios.Scenario(entry.get('name', '{}-{}'.format(default_name, idx)),
+                               tuple(tuple(point) for point in entry['surface']), tuple(entry['state']))
+            for idx, entry in enumerate(entries)]
+
+
+def collect_scenarios(sources):
+    """Scenarios of the command line ``sources``
+
+    Args:
+      sources: canned scenario names, surface files, directories of
+        ``.txt`` surface files and ``.json``/``.jsonl`` manifests
+
+    Returns:
+      list: :class:`marslander.scenarios.Scenario` in the given order,
+      directories sorted by file name
+    """
+    found = []
+    for source in sources:
+        if os.path.isdir(source):
+            found += [load_scenario(os.path.join(source, name))
+                      for name in sorted(os.listdir(source)) if name.endswith('.txt')]
+        elif source.endswith(('.json', '.jsonl')):
+            found += _manifest_scenarios(source)
+        else:
+            found.append(load_scenario(source))
+    return found
+
+
+def _final_state(solver_name, solver, arguments, chromosome):
+    state, steps = solver.simulate_final(*arguments, chromosome)
+    if solver_name == 'marslander1':
+        return {'steps': steps, 'y': float(state[1]), 'v_speed': float(state[2]), 'fuel': float(state[3]),
+                'power': int(state[4]), 'fly_state': state[5].name}
+    x, y, h_speed, v_speed, fuel, angle, power = state.reported()
+    return {'steps': steps, 'x': x, 'y': y, 'h_speed': h_speed, 'v_speed': v_speed, 'fuel': fuel, 'angle': angle,
+            'power': power, 'fly_state': state.fly_state.name}
+
+
+def solve(solver_name, scenario, stream, budget, store_path=None, adaptive=False):
+    """Plan one scenario
+
+    Args:
+      solver_name (str): name from ``SOLVERS``
+      scenario (Scenario): scenario to solve
+      stream (tuple): :attr:`marslander.rng.SolverRandom.state` of the
+        random stream to plan with
+      budget (float): seconds to plan, 0 for the solver's
+        ``GENERATION_COUNT`` generations
+      store_path (str): :class:`marslander.store.SolutionStore` database to
+        seed the population from and store the fittest genomes in
+      adaptive (bool): plan with an
+        :class:`marslander.adaptive.AdaptiveController`
+
+    Returns:
+      dict: the JSON line of the scenario
+    """
+    started = perf_counter()
+    result = {'name': scenario.name, 'solver': solver_name}
+    try:
+        solver = importlib.import_module(SOLVERS[solver_name])
+        arguments = ARGUMENTS[solver_name](scenario)
+        metrics = Metrics()
+        rng = SolverRandom(*stream)
+        cache = FitnessCache()
+        store = SolutionStore(store_path) if store_path else None
+        population = None
+        controller = AdaptiveController(solver.MUTATION_CHANCE, solver.POPULATION_SIZE) if adaptive else None
+        stored = store.get(solver.SOLVER_NAME, scenario.surface, scenario.state) if store is not None else None
+        if stored:
+            population = solver.seed_population([genome for genome, _ in stored], rng)
+        best_chromosome, best_fitness, population = solver.plan(
+            *arguments, deadline=started + budget if budget else None, population=population, cache=cache, rng=rng,
+            metrics=metrics, controller=controller)
+        if store is not None:
+            fitness_array = solver.evaluate_population(*arguments, population, cache)
+            store.put(solver.SOLVER_NAME, scenario.surface, scenario.state, zip(population, fitness_array))
+            store.close()
+            result['seeded'] = len(stored)
+        final_state = _final_state(solver_name, solver, arguments, best_chromosome)
+        result.update(genome=[[int(value) for value in gene] for gene in best_chromosome],
+                      final_state=final_state, fuel=final_state['fuel'],
+                      landed=final_state['fly_state'] == 'LANDED', fitness=float(best_fitness),
+                      generations=metrics.counters['generations'], evaluations=metrics.counters['evaluations'])
+    except Exception as error:
+        _logger.exception('%s failed', scenario.name)
+        result['error'] = '{}: {}'.format(type(error).__name__, error)
+    result['wall_time'] = perf_counter() - started
+    return result
+
+
+def _solve(task):
+    return solve(*task)
+
+
+def solve_all(found, solver_name='marslander2', budget=1., workers=None, seed=None, store_path=None,
+              adaptive=False):
+    """Solve the ``found`` scenarios on a process pool
+
+    Yields:
+      dict: the result of every scenario in the order they finish
+    """
+    streams = SolverRandom(seed).spawn(len(found))
+    tasks = [(solver_name, scenario, stream.state, budget, store_path, adaptive)
+             for scenario, stream in zip(found, streams)]
+    workers = min(workers or available_cpus(), len(tasks)) or 1
+    if workers == 1:
+        for task in tasks:
+            yield _solve(task)
+        return
+    pool = multiprocessing.Pool(workers)
+    try:
+        for result in pool.imap_unordered(_solve, tasks):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def parse_args(args):
+    """Parse command line parameters
+
+    Args:
+      args ([str]): command line parameters as list of strings
+
+    Returns:
+      :obj:`argparse.Namespace`: command line parameters namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Solve Mars Lander scenarios in parallel, one JSON line per scenario")
+    parser.add_argument(
+        '--version',
+        action='version',
+        version='marslander {ver}'.format(ver=__version__))
+    parser.add_argument(
+        dest="sources",
+        help="scenario names, surface files, directories or manifests",
+        nargs='+',
+        metavar="SCENARIO")
+    parser.add_argument(
+        '--solver',
+        help="solver to plan with (default: %(default)s)",
+        choices=sorted(SOLVERS),
+        default='marslander2')
+    parser.add_argument(
+        '-b',
+        '--budget',
+        help="seconds per scenario, 0 for a fixed generation count (default: %(default)s)",
+        type=float,
+        default=1.)
+    parser.add_argument(
+        '-j',
+        '--workers',
+        help="worker processes (default: available cores)",
+        type=int)
+    parser.add_argument(
+        '--seed',
+        help="seed the scenario streams are spawned from",
+        type=int)
+    parser.add_argument(
+        '-o',
+        '--output',
+        help="file to write the JSON lines to (default: stdout)",
+        metavar="FILE")
+    parser.add_argument(
+        '--store',
+        help="SQLite solution store to seed from and save to",
+        metavar="FILE")
+    parser.add_argument(
+        '--adaptive',
+        help="adapt population and mutation to the search and stop once a landing is stable",
+        action='store_true')
+    parser.add_argument(
+        '-v',
+        '--verbose',
+        dest="loglevel",
+        help="set loglevel to INFO",
+        action='store_const',
+        const=logging.INFO)
+    parser.add_argument(
+        '-vv',
+        '--very-verbose',
+        dest="loglevel",
+        help="set loglevel to DEBUG",
+        action='store_const',
+        const=logging.DEBUG)
+    return parser.parse_args(args)
+
+
+def setup_logging(loglevel):
+    """Setup basic logging
+
+    Args:
+      loglevel (int): minimum loglevel for emitting messages
+    """
+    logformat = "[%(asctime)s] %(levelname)s:%(name)s:%(message)s"
+    logging.basicConfig(level=loglevel, stream=sys.stderr,
+                        format=logformat, datefmt="%Y-%m-%d %H:%M:%S")
+
+
+def main(args):
+    """Main entry point allowing external calls
+
+    Args:
+      args ([str]): command line parameter list
+
+    Returns:
+      int: 0 when every scenario was solved without an error
+    """
+    args = parse_args(args)
+    setup_logging(args.loglevel)
+    found = collect_scenarios(args.sources)
+    _logger.info('solving %d scenarios', len(found))
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    failed = 0
+    try:
+        for result in solve_all(found, args.solver, args.budget, args.workers, args.seed, args.store,
+                                args.adaptive):
+            failed += 'error' in result
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if failed else 0
+
+
+def run():
+    """Entry point for console_scripts
+    """
+    sys.exit(main(sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    run()
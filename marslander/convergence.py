@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Per generation record of how a search converges.
+
+Pass a :class:`ConvergenceRecorder` as ``recorder`` to a solver's
+``evolve`` and it keeps, for every evaluated generation, the seconds since
+the recorder was started, the best and mean fitness and the fitness
+diversity (population standard deviation). The rows are written as CSV.
+"""
+from __future__ import division, print_function, absolute_import
+
+import csv
+import math
+from time import perf_counter
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+FIELDS = ('generation', 'time', 'best', 'mean', 'diversity')
+
+
+class ConvergenceRecorder(object):
+    """Collects (generation, time, best, mean, diversity) rows
+
+    Args:
+      started (float): ``perf_counter()`` value times are measured from,
+        defaults to now
+    """
+
+    def __init__(self, started=None):
+        self.started = perf_counter() if started is None else started
+        self.rows = []
+
+    def __len__(self):
+        return len(self.rows)
+
+    def record(self, generation, fitness_array):
+        """Add the row of an evaluated generation
+
+        Args:
+          generation (int): index of the generation
+          fitness_array: fitness values of its population
+        """
+        values = [float(value) for value in fitness_array]
+        mean = sum(values) / len(values)
+        diversity = math.sqrt(sum((value - mean) ** 2 for value in values) / len(values))
+        self.rows.append((generation, perf_counter() - self.started, max(values), mean, diversity))
+
+    def column(self, field):
+        """list: values of ``field`` (one of ``FIELDS``) of every row"""
+        idx = FIELDS.index(field)
+        return [row[idx] for row in self.rows]
+
+    def write_csv(self, path):
+        """Write the header and all rows to the CSV file ``path``"""
+        with open(path, 'w', newline='') as output:
+            writer = csv.writer(output)
+            writer.writerow(FIELDS)
+            writer.writerows(self.rows)
+
+    def __repr__(self):
+        return 'ConvergenceRecorder(generations={})'.format(len(self.rows))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Island model genetic algorithm for the marslander solvers.
+
+Every island is a process evolving its own population with the solver's
+``evaluate_population`` and ``breed``. Every ``migration_interval``
+generations an island puts copies of its best chromosomes into the inbox
+queues of its neighbours and takes in whatever migrants have arrived,
+replacing its last children with them. Neither side blocks, so islands
+running at different speeds never wait for each other.
+"""
+from __future__ import division, print_function, absolute_import
+
+import queue
+import importlib
+import multiprocessing
+from time import perf_counter
+
+from marslander import selection
+from marslander.cache import FitnessCache
+from marslander.parallel import available_cpus
+from marslander.rng import SolverRandom
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+TOPOLOGIES = ('ring', 'full')
+
+
+def migration_routes(islands, topology='ring'):
+    """Neighbours every island sends its migrants to
+
+    Args:
+      islands (int): number of islands
+      topology: ``'ring'`` (to the next island), ``'full'`` (to all others)
+        or a mapping of island index to an iterable of target indices
+
+    Returns:
+      dict: island index -> list of target island indices
+    """
+    if topology == 'ring':
+        return {idx: [(idx + 1) % islands] for idx in range(islands) if islands > 1}
+    elif topology == 'full':
+        return {idx: [target for target in range(islands) if target != idx] for idx in range(islands)}
+    elif isinstance(topology, dict):
+        return {idx: list(topology.get(idx, ())) for idx in range(islands)}
+    raise ValueError('unknown topology {!r}, use one of {} or a mapping'.format(topology, TOPOLOGIES))
+
+
+def _island(solver_name, scenario, stream, generations, deadline, migration_interval, migrants,
+            outboxes, inbox, result_connection):
+    solver = importlib.import_module(solver_name)
+    rng = SolverRandom(*stream)
+    cache = FitnessCache()
+    population = solver.random_population(rng)
+    best_chromosome = best_fitness = None
+
+    for generation_idx in range(generations):
+        fitness_array = solver.evaluate_population(*scenario, population, cache)
+        ranking = selection.elites(list(fitness_array), max(migrants, 1))
+        if best_fitness is None or fitness_array[ranking[0]] > best_fitness:
+            best_chromosome, best_fitness = population[ranking[0]], fitness_array[ranking[0]]
+
+        if deadline is not None and perf_counter() > deadline:
+            break
+
+        migrating = (generation_idx + 1) % migration_interval == 0
+        if migrating:
+            elites = [population[idx] for idx in ranking[:migrants]]
+            for outbox in outboxes:
+                outbox.put(elites)
+
+        population, _ = solver.breed(population, fitness_array, rng=rng)
+
+        if migrating:
+            immigrants = []
+            while True:
+                try:
+                    immigrants += inbox.get_nowait()
+                except queue.Empty:
+                    break
+            slots = range(len(population) - 1, -1, -1)
+            for slot, chromosome in zip(slots, immigrants[:len(population)]):
+                population[slot] = chromosome
+
+    for outbox in outboxes:
+        outbox.cancel_join_thread()
+    result_connection.send((best_chromosome, best_fitness, cache.hits, cache.misses))
+    result_connection.close()
+
+
+def run_islands(solver, scenario, islands=None, generations=None, deadline=None, migration_interval=5, migrants=2,
+                topology='ring', seed=None):
+    """Evolve ``islands`` populations in parallel with periodic migration
+
+    Args:
+      solver: solver module, e.g. :mod:`marslander.marslander1.solution`
+      scenario (tuple): leading arguments of the solver's
+        ``evaluate_population``
+      islands (int): number of processes, defaults to the available cores
+      generations (int): generations per island, defaults to the solver's
+        ``GENERATION_COUNT``
+      deadline (float): ``perf_counter()`` value to stop breeding at
+      migration_interval (int): generations between migrations
+      migrants (int): number of best chromosomes sent to each neighbour
+      topology: see :func:`migration_routes`
+      seed (int): seed of the run, island ``i`` evolves with the ``i``-th
+        stream spawned from it (see :mod:`marslander.rng`)
+
+    Returns:
+      tuple: best chromosome, its fitness and the per island
+      (chromosome, fitness, cache hits, cache misses) results
+    """
+    islands = islands or available_cpus()
+    generations = generations or solver.GENERATION_COUNT
+    streams = SolverRandom(seed).spawn(islands)
+
+    inboxes = [multiprocessing.Queue() for _ in range(islands)]
+    routes = migration_routes(islands, topology)
+
+    processes = []
+    results = []
+    for idx in range(islands):
+        result_receiver, result_sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_island, daemon=True,
+            args=(solver.__name__, scenario, streams[idx].state, generations, deadline, migration_interval, migrants,
+                  [inboxes[target] for target in routes.get(idx, ())], inboxes[idx], result_sender))
+        process.start()
+        result_sender.close()
+        processes.append(process)
+        results.append(result_receiver)
+
+    results = [connection.recv() for connection in results]
+    for process in processes:
+        process.join()
+
+    best = max(results, key=lambda result: result[1])
+    return best[0], best[1], results
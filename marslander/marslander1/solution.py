@@ -1,39 +1,55 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import sys
-import math
-import random
+import os
+import logging
+import itertools
+import numpy as np
 from enum import Enum
+from time import perf_counter
+
+from marslander import operators, selection
+from marslander.cache import FitnessCache
+from marslander.metrics import NULL_METRICS
+from marslander.rng import SolverRandom, default_random
 
 '''
 EXAMPLE OF ENCODING:
-power: 0-4 -> 0 1 2 3 4 	-> 5 values     -> 5 DEC = 101 BIN
-time: 1-40 -> 1 2 .. 39 40	-> 40 values    -> 40 DEC = 101000 BIN
-chromosome: 3 + 6 = 9 bits for one command
+power: 0-4 -> 0 1 2 3 4 	-> 5 values
+time: 5-20 -> 5 6 .. 19 20	-> 16 values
+command: (power, time) pair of uint8 -> (3, 12)
+chromosome: COMMAND_COUNT x 2 uint8 array, population: POPULATION_SIZE x COMMAND_COUNT x 2
 '''
 
 POWER_MIN = 0
 POWER_MAX = 4
-POWER_SIZE = int(math.log2(POWER_MAX)) + 1
-POWER_BIN_FORMAT = '0{}b'.format(POWER_SIZE)
 POWER_LIMIT = 1
 TIME_MIN = 5
 TIME_MAX = 20
-TIME_SIZE = int(math.log2(TIME_MAX)) + 1
-TIME_BIN_FORMAT = '0{}b'.format(TIME_SIZE)
 GRAVITY = -3.711
 HEIGHT_MAX = 3000
+LANDING_V_SPEED = 30
 
 
-COMMAND_SIZE = POWER_SIZE + TIME_SIZE
+GENOME_DTYPE = np.uint8
+COMMAND_SIZE = 2
 COMMAND_COUNT = 10
 CHROMOSOME_SIZE = COMMAND_SIZE * COMMAND_COUNT
 POPULATION_SIZE = 20
 GENERATION_COUNT = 30
 
 MUTATION_CHANCE = 0.01
+CROSSOVER_POINTS = 1
 ELITISM = True
+SELECTION = selection.roulette
+ROLLING_HORIZON = True
+PRUNING = True      # evaluation decides hopeless landers at command boundaries instead of simulating them on
+SOLVER_NAME = 'marslander1'     # key of the solver's genomes in a marslander.store.SolutionStore
+
+FIRST_TURN_TIME = 0.9   # seconds, the referee allows 1 s for the first turn
+TURN_TIME = 0.08        # and 100 ms for every other one
+
+_logger = logging.getLogger(__name__)
 
 
 class FlyState(Enum):
@@ -43,32 +59,22 @@ class FlyState(Enum):
 
 
 def encode_chromosome(commands):
-    chromosome = ''
-    for command in commands:
-        chromosome += format(command[0], POWER_BIN_FORMAT) + format(command[1], TIME_BIN_FORMAT)
-    return chromosome
+    return np.array(commands, dtype=GENOME_DTYPE)
 
 
 def replace_command(chromosome, command_idx, command):
-    command_start = command_idx * COMMAND_SIZE
-    encoded_command = format(command[0], POWER_BIN_FORMAT) + format(command[1], TIME_BIN_FORMAT)
-    command_end = command_start + COMMAND_SIZE
-    return chromosome[:command_start] + encoded_command + chromosome[command_end:]
+    replaced = chromosome.copy()
+    replaced[command_idx] = command
+    return replaced
 
 
 def decode_chromosome_idx(chromosome, command_idx):
-    command_start = command_idx * COMMAND_SIZE
-    power = int(chromosome[command_start:command_start + POWER_SIZE], 2)
-    time = int(chromosome[command_start + POWER_SIZE:command_start + POWER_SIZE + TIME_SIZE], 2)
-    return power, time
+    power, time = chromosome[command_idx]
+    return int(power), int(time)
 
 
 def decode_chromosome(chromosome):
-    commands = []
-    for command_idx in range(COMMAND_COUNT):
-        power, time = decode_chromosome_idx(chromosome, command_idx)
-        commands.append((power, time))
-    return commands
+    return [tuple(command) for command in chromosome.tolist()]
 
 
 def trim(value, limit):
@@ -80,6 +86,105 @@ def trim(value, limit):
         return value
 
 
+def _crossing_steps(height, speed, acceleration):
+    """First step ``k`` at which ``height + k * speed + acceleration * k * k / 2`` drops below zero
+
+    Works on scalars and arrays alike, NaN where it never does.
+    """
+    with np.errstate(invalid='ignore'):
+        root = (-speed - np.sqrt(speed ** 2 - 2 * acceleration * height)) / acceleration
+    steps = np.maximum(np.floor(root) + 1, 1)
+    return np.where(height + steps * speed + acceleration * steps * steps / 2 < 0, steps, np.nan)
+
+
+def project_outcome(landing_height, position, speed, power, remaining):
+    """Terminal (position, speed) a flying lander can no longer avoid
+
+    A rising lander that passes ``HEIGHT_MAX`` even with the engine off
+    crashes there. A lander falling faster than ``LANDING_V_SPEED`` that
+    still reaches ``landing_height`` too fast when its power ramps up to
+    ``POWER_MAX`` as fast as possible crashes at the impact of that braking.
+    Both bounds are optimistic and only decide a lander reaching them within
+    the ``remaining`` steps of its commands, so a lander that can still land
+    or outlast its commands is never projected.
+
+    Returns:
+      tuple: (position, speed) of the crash, None while it is not certain
+    """
+    if speed > 0:
+        steps = float(_crossing_steps(HEIGHT_MAX - position, -speed - GRAVITY / 2, -GRAVITY))
+        if not steps <= remaining:
+            return None
+        return position + steps * speed + GRAVITY * steps * (steps + 1) / 2, speed + steps * GRAVITY
+    if speed > -LANDING_V_SPEED:
+        return None
+
+    steps = 0
+    while power < POWER_MAX:
+        power += POWER_LIMIT
+        speed += GRAVITY + power
+        position += speed
+        steps += 1
+        if speed > -LANDING_V_SPEED or steps > remaining:
+            return None
+        if position < landing_height:
+            return position, speed
+
+    acceleration = GRAVITY + POWER_MAX
+    crossing = float(_crossing_steps(position - landing_height, speed + acceleration / 2, acceleration))
+    if not (steps + crossing <= remaining and speed + crossing * acceleration <= -LANDING_V_SPEED):
+        return None
+    return (position + crossing * speed + acceleration * crossing * (crossing + 1) / 2,
+            speed + crossing * acceleration)
+
+
+def project_states(landing_height, states, remaining):
+    """:func:`project_outcome` of every flying row of a (count, 6) ``states`` array
+
+    ``remaining`` holds the steps left in the commands of every row. Returns
+    a copy of ``states`` with the projected rows crashed.
+    """
+    states = states.copy()
+    flying = states[:, 5] == FlyState.FLYING.value
+    position = states[:, 1].copy()
+    speed = states[:, 2].copy()
+    power = states[:, 4].copy()
+    steps = np.zeros(len(states))
+    projected = np.zeros(len(states), dtype=bool)
+
+    ceiling = _crossing_steps(HEIGHT_MAX - position, -speed - GRAVITY / 2, -GRAVITY)
+    lost = flying & (speed > 0) & (ceiling <= remaining)
+    states[lost, 1] = (position + ceiling * speed + GRAVITY * ceiling * (ceiling + 1) / 2)[lost]
+    states[lost, 2] = (speed + ceiling * GRAVITY)[lost]
+    projected |= lost
+
+    falling = flying & (speed <= -LANDING_V_SPEED)
+    for _ in range(POWER_MAX - POWER_MIN):
+        ramp = falling & (power < POWER_MAX)
+        if not ramp.any():
+            break
+        power = np.where(ramp, power + POWER_LIMIT, power)
+        speed = np.where(ramp, speed + (GRAVITY + power), speed)
+        position = np.where(ramp, position + speed, position)
+        steps += ramp
+        safe = ramp & ((speed > -LANDING_V_SPEED) | (steps > remaining))
+        crashed = ramp & ~safe & (position < landing_height)
+        states[crashed, 1] = position[crashed]
+        states[crashed, 2] = speed[crashed]
+        projected |= crashed
+        falling &= ~(safe | crashed)
+
+    acceleration = GRAVITY + POWER_MAX
+    crossing = _crossing_steps(position - landing_height, speed + acceleration / 2, acceleration)
+    crashed = falling & (steps + crossing <= remaining) & (speed + crossing * acceleration <= -LANDING_V_SPEED)
+    states[crashed, 1] = (position + crossing * speed + acceleration * crossing * (crossing + 1) / 2)[crashed]
+    states[crashed, 2] = (speed + crossing * acceleration)[crashed]
+    projected |= crashed
+
+    states[projected, 5] = FlyState.CRASHED.value
+    return states
+
+
 def calculate_trajectory(landing_height, initial_position, initial_speed, initial_fuel, initial_power, chromosome):
     time = 1
     position = initial_position
@@ -103,7 +208,7 @@ def calculate_trajectory(landing_height, initial_position, initial_speed, initia
             if position > HEIGHT_MAX:
                 fly_state = FlyState.CRASHED
             elif position < landing_height:
-                fly_state = FlyState.LANDED if speed > -30 else FlyState.CRASHED
+                fly_state = FlyState.LANDED if speed > -LANDING_V_SPEED else FlyState.CRASHED
 
             states.append([time, position, speed, fuel, power, fly_state])
 
@@ -116,33 +221,216 @@ def calculate_trajectory(landing_height, initial_position, initial_speed, initia
     return states
 
 
-def weighted_choice(pairs):
-    weight_total = sum((item[1] for item in pairs))
-    n = random.uniform(0, weight_total)
-    for item, weight in pairs:
-        if n < weight:
-            return item
-        n = n - weight
-    return item
+def simulate_final(landing_height, initial_position, initial_speed, initial_fuel, initial_power, chromosome,
+                   pruning=False):
+    """Simulate without recording, returns the terminal state and the step count
+
+    With ``pruning`` a lander :func:`project_outcome` decides after a command
+    stops there with the projected crash as its terminal state, the step
+    count is the one it was decided at.
+    """
+    total_time = int(chromosome[:, 1].sum())
+    steps = 0
+    position = initial_position
+    speed = initial_speed
+    fuel = initial_fuel
+    power = initial_power
+    fly_state = FlyState.FLYING
+
+    for cmd_power, cmd_time in chromosome.tolist():
+        for _ in range(cmd_time):
+            power += trim(cmd_power - power, POWER_LIMIT)
+            speed += GRAVITY + power
+            position += speed
+            fuel -= power
+            steps += 1
+
+            if position > HEIGHT_MAX:
+                fly_state = FlyState.CRASHED
+            elif position < landing_height:
+                fly_state = FlyState.LANDED if speed > -LANDING_V_SPEED else FlyState.CRASHED
+
+            if fly_state != FlyState.FLYING:
+                break
+
+        if pruning and fly_state == FlyState.FLYING:
+            projected = project_outcome(landing_height, position, speed, power, total_time - steps)
+            if projected is not None:
+                position, speed = projected
+                fly_state = FlyState.CRASHED
+
+        if fly_state != FlyState.FLYING:
+            break
+
+    return [steps + 1, position, speed, fuel, power, fly_state], steps
+
+
+def simulate_command(landing_height, states, commands):
+    """Advance every row of ``states`` through its (power, time) row of ``commands``
+
+    Power ramps towards the commanded value one step at a time, after that it
+    stays constant and the rest of the command is integrated in closed form:
+    after ``k`` more steps speed is ``v + k * a`` and position
+    ``p + k * v + a * k * (k + 1) / 2``. The first step crossing
+    ``landing_height`` or ``HEIGHT_MAX`` is found among all ``k`` at once.
+    """
+    time, position, speed, fuel, power, fly_state = states.T.copy()
+    cmd_power = commands[:, 0].astype(float)
+    cmd_time = commands[:, 1].astype(float)
+    steps = np.zeros(len(states))
+    flying = fly_state == FlyState.FLYING.value
 
+    for _ in range(POWER_MAX - POWER_MIN):
+        active = flying & (steps < cmd_time) & (power != cmd_power)
+        if not active.any():
+            break
+
+        power = np.where(active, power + np.clip(cmd_power - power, -POWER_LIMIT, POWER_LIMIT), power)
+        speed = np.where(active, speed + (GRAVITY + power), speed)
+        position = np.where(active, position + speed, position)
+        fuel = np.where(active, fuel - power, fuel)
+        steps += active
+
+        crashed = active & (position > HEIGHT_MAX)
+        touched = active & ~crashed & (position < landing_height)
+        fly_state[crashed] = FlyState.CRASHED.value
+        fly_state[touched] = np.where(speed[touched] > -LANDING_V_SPEED, FlyState.LANDED.value,
+                                      FlyState.CRASHED.value)
+        flying &= ~(crashed | touched)
+
+    idx = np.flatnonzero(flying & (steps < cmd_time))
+    if len(idx) > 0:
+        remaining = cmd_time[idx] - steps[idx]
+        acceleration = GRAVITY + power[idx]
+        k = np.arange(1, TIME_MAX + 1)
+        positions = (position[idx, None] + k * speed[idx, None]) + acceleration[:, None] * (k * (k + 1) / 2)
+        crossing = (k <= remaining[:, None]) & ((positions > HEIGHT_MAX) | (positions < landing_height))
+        crossed = crossing.any(axis=1)
+        k_end = np.where(crossed, crossing.argmax(axis=1) + 1, remaining)
+
+        speed[idx] += k_end * acceleration
+        position[idx] = positions[np.arange(len(idx)), k_end.astype(int) - 1]
+        fuel[idx] -= k_end * power[idx]
+        steps[idx] += k_end
+        fly_state[idx] = np.where(
+            ~crossed, FlyState.FLYING.value,
+            np.where((position[idx] <= HEIGHT_MAX) & (speed[idx] > -LANDING_V_SPEED), FlyState.LANDED.value,
+                     FlyState.CRASHED.value))
+
+    time += steps
+    return np.column_stack((time, position, speed, fuel, power, fly_state))
+
+
+def calculate_checkpoints(landing_height, initial_position, initial_speed, initial_fuel, initial_power, commands,
+                          start=None, resume=None, pruning=False):
+    """Simulate the whole population at once, one lander per row of ``commands``
+
+    ``commands`` is a (population, COMMAND_COUNT, 2) genome array. Returns a
+    (population, COMMAND_COUNT + 1, 6) array of the states at command
+    boundaries in the layout of :func:`calculate_trajectory`, the fly state
+    stored as its value: ``[:, k]`` is the state before command ``k`` and
+    ``[:, -1]`` the final state. Landers that stopped early repeat their last
+    state. With ``pruning`` the landers :func:`project_states` decides after
+    a command stop there with their projected crash.
+
+    To simulate only a suffix, ``resume`` holds checkpoints to keep the prefix
+    from and ``start`` the index of the first command to simulate per lander.
+    With ``pruning`` the prefix was decided with the steps left in the
+    commands the checkpoints come from, so a lander restarts from the first
+    command its prefix ends in or its own steps left would project after.
+    """
+    count, command_count = commands.shape[:2]
+    times = commands[:, :, 1].astype(int)
+    remaining = times.sum(axis=1)[:, None] - times.cumsum(axis=1)
+    if resume is None:
+        checkpoints = np.empty((count, command_count + 1, 6))
+        checkpoints[:, 0] = (1, initial_position, initial_speed, initial_fuel, initial_power, FlyState.FLYING.value)
+        start = np.zeros(count, dtype=int)
+    else:
+        checkpoints = resume.copy()
+        if pruning:
+            prefix = project_states(landing_height, checkpoints[:, 1:].reshape(-1, 6), remaining.reshape(-1))
+            ended = prefix[:, 5].reshape(count, command_count) != FlyState.FLYING.value
+            ended &= np.arange(command_count) < start[:, None]
+            start = np.where(ended.any(axis=1), ended.argmax(axis=1), start)
+    states = checkpoints[np.arange(count), start]
+
+    for command_idx in range(command_count):
+        started = start <= command_idx
+        idx = np.flatnonzero(started & (states[:, 5] == FlyState.FLYING.value))
+        if len(idx) > 0:
+            states[idx] = simulate_command(landing_height, states[idx], commands[idx, command_idx])
+            if pruning:
+                states[idx] = project_states(landing_height, states[idx], remaining[idx, command_idx])
+        checkpoints[started, command_idx + 1] = states[started]
+
+    return checkpoints
+
+
+def calculate_final_states(landing_height, initial_position, initial_speed, initial_fuel, initial_power, commands,
+                           pruning=False):
+    """Final states of :func:`calculate_checkpoints`, a (population, 6) array"""
+    return calculate_checkpoints(landing_height, initial_position, initial_speed, initial_fuel, initial_power,
+                                 commands, pruning=pruning)[:, -1]
+
+
+def random_command(rng=None):
+    rng = rng or default_random()
+    return rng.randint(POWER_MIN, POWER_MAX), rng.randint(TIME_MIN, TIME_MAX)
 
-def random_population():
+
+def random_population(rng=None):
+    rng = rng or default_random()
     population = []
     for chromosome_idx in range(POPULATION_SIZE):
         commands = []
         for command_idx in range(COMMAND_COUNT):
-            power = random.randint(POWER_MIN, POWER_MAX)
-            time = random.randint(TIME_MIN, TIME_MAX)
-            commands.append((power, time))
+            commands.append(random_command(rng))
+
+        population.append(commands)
+    return encode_chromosome(population)
+
 
-        population.append(encode_chromosome(commands))
+def seed_population(genomes, rng=None):
+    """Population starting with ``genomes``, fittest first, padded with random chromosomes
+
+    Genomes of a different length, e.g. stored before ``COMMAND_COUNT``
+    changed, are skipped.
+    """
+    population = random_population(rng)
+    seeded = [genome for genome in genomes if len(genome) == COMMAND_COUNT][:POPULATION_SIZE]
+    if seeded:
+        population[:len(seeded)] = encode_chromosome(seeded)
     return population
 
 
+def random_genomes(rng, count):
+    """``count`` random chromosomes drawn from the numpy.random.Generator ``rng``"""
+    genomes = np.empty((count, COMMAND_COUNT, 2), dtype=GENOME_DTYPE)
+    genomes[:, :, 0] = rng.integers(POWER_MIN, POWER_MAX + 1, size=(count, COMMAND_COUNT))
+    genomes[:, :, 1] = rng.integers(TIME_MIN, TIME_MAX + 1, size=(count, COMMAND_COUNT))
+    return genomes
+
+
+def shift_population(population, rng=None):
+    """Drop the step executed this turn from every chromosome
+
+    The first command loses one step of its time, exhausted commands are
+    shifted out and a random command drawn from ``rng`` is padded at the end.
+    """
+    rng = rng or default_random()
+    shifted = population.copy()
+    shifted[:, 0, 1] -= 1
+    for chromosome in shifted:
+        while chromosome[0, 1] == 0:
+            chromosome[:-1] = chromosome[1:]
+            chromosome[-1] = random_command(rng)
+    return shifted
+
+
 def fitness(landing_height, position, speed, fuel, power, chromosome):
     result = None
-    trajectory = calculate_trajectory(landing_height, position, speed, fuel, power, chromosome)
-    last_state = trajectory[-1]
+    last_state, _ = simulate_final(landing_height, position, speed, fuel, power, chromosome, PRUNING)
     if last_state[5] == FlyState.LANDED:
         result = last_state[3]
     elif last_state[5] == FlyState.FLYING:
@@ -160,85 +448,295 @@ def fitness(landing_height, position, speed, fuel, power, chromosome):
     return result
 
 
-def crossover(chromosome1, chromosome2):
-    pos = int(random.random() * COMMAND_COUNT) * COMMAND_SIZE
-    return chromosome1[:pos] + chromosome2[pos:], chromosome2[:pos] + chromosome1[pos:]
-
-
-def mutate(chromosome):
+def states_fitness(landing_height, states):
+    fly_state = states[:, 5]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crashed = 200 / -states[:, 2]
+    return np.select(
+        [fly_state == FlyState.LANDED.value,
+         fly_state == FlyState.FLYING.value,
+         states[:, 1] > HEIGHT_MAX],
+        [states[:, 3],
+         1-((states[:, 1]-landing_height)/3000),
+         0],
+        crashed)
+
+
+def evaluate_population(landing_height, position, speed, fuel, power, population, cache=None, evaluator=None):
+    """Fitness array of ``population``
+
+    Chromosomes found in ``cache`` are not simulated, the rest is simulated
+    here or handed to ``evaluator`` (see :mod:`marslander.parallel`).
+    """
+    def simulate(chromosomes):
+        if evaluator is not None:
+            return evaluator(chromosomes)
+        states = calculate_final_states(landing_height, position, speed, fuel, power, chromosomes, PRUNING)
+        return states_fitness(landing_height, states)
+
+    if cache is None:
+        return simulate(population)
+
+    scenario = (landing_height, position, speed, fuel, power)
+    keys = [(scenario, chromosome.tobytes()) for chromosome in population]
+    fitness_array = np.array([cache.get(key, np.nan) for key in keys])
+    missing = np.flatnonzero(np.isnan(fitness_array))
+    if len(missing) > 0:
+        fitness_array[missing] = simulate(population[missing])
+        for idx in missing:
+            cache.put(keys[idx], fitness_array[idx])
+    return fitness_array
+
+
+def evaluate_generation(landing_height, position, speed, fuel, power, population,
+                        parent_population=None, parents=None, parent_checkpoints=None, cache=None):
+    """Evaluate ``population`` resuming every child from its parent's checkpoints
+
+    ``parents`` holds for each chromosome the index of the parent in
+    ``parent_population`` it shares its leading commands with, only commands
+    from the first differing one are simulated. Returns the fitness array and
+    the checkpoints of ``population``. Rows answered by the cache have no
+    checkpoints (NaN), their children are simulated from the start.
+    """
+    count = len(population)
+    if parent_population is None:
+        resume = np.empty((count, COMMAND_COUNT + 1, 6))
+        resume[:] = np.nan
+        start = np.zeros(count, dtype=int)
+    else:
+        resume = parent_checkpoints[parents]
+        differs = (population != parent_population[parents]).any(axis=2)
+        start = np.where(differs.any(axis=1), differs.argmax(axis=1), COMMAND_COUNT)
+    unknown = np.isnan(resume[:, 0, 0])
+    resume[unknown, 0] = (1, position, speed, fuel, power, FlyState.FLYING.value)
+    start[unknown] = 0
+
+    checkpoints = resume
+    fitness_array = np.full(count, np.nan)
+    unchanged = start == COMMAND_COUNT
+    fitness_array[unchanged] = states_fitness(landing_height, resume[unchanged, -1])
+
+    if cache is not None:
+        scenario = (landing_height, position, speed, fuel, power)
+        keys = [(scenario, chromosome.tobytes()) for chromosome in population]
+        for idx in np.flatnonzero(~unchanged):
+            fitness_value = cache.get(keys[idx])
+            if fitness_value is not None:
+                fitness_array[idx] = fitness_value
+                checkpoints[idx] = np.nan
+
+    missing = np.flatnonzero(np.isnan(fitness_array))
+    if len(missing) > 0:
+        checkpoints[missing] = calculate_checkpoints(landing_height, position, speed, fuel, power,
+                                                     population[missing], start[missing], resume[missing],
+                                                     PRUNING)
+        fitness_array[missing] = states_fitness(landing_height, checkpoints[missing, -1])
+        if cache is not None:
+            for idx in missing:
+                cache.put(keys[idx], fitness_array[idx])
+
+    return fitness_array, checkpoints
+
+
+def crossover(chromosome1, chromosome2, rng=None):
+    rng = rng or default_random()
+    pos = int(rng.random() * COMMAND_COUNT)
+    return (np.concatenate((chromosome1[:pos], chromosome2[pos:])),
+            np.concatenate((chromosome2[:pos], chromosome1[pos:])))
+
+
+def mutate(chromosome, rng=None):
+    rng = rng or default_random()
     mutated = chromosome
     mutations = int(MUTATION_CHANCE * CHROMOSOME_SIZE) + 1
     for _ in range(mutations):
-        if random.randrange(MUTATION_CHANCE * 100) == 0:
-            command_idx = random.randrange(COMMAND_COUNT)
-            power, time = decode_chromosome_idx(mutated, command_idx)
-            if random.randrange(COMMAND_SIZE) < POWER_SIZE:
-                power = random.randint(POWER_MIN, POWER_MAX)
+        if rng.randrange(int(MUTATION_CHANCE * 100)) == 0:
+            command_idx = rng.randrange(COMMAND_COUNT)
+            if mutated is chromosome:
+                mutated = chromosome.copy()
+            if rng.randrange(COMMAND_SIZE) == 0:
+                mutated[command_idx, 0] = rng.randint(POWER_MIN, POWER_MAX)
             else:
-                time = random.randint(TIME_MIN, TIME_MAX)
-            mutated = replace_command(mutated, command_idx, (power, time))
+                mutated[command_idx, 1] = rng.randint(TIME_MIN, TIME_MAX)
 
     return mutated
 
 
-def get_best_trajectory(landing_height, position, speed, fuel, power):
-    population = random_population()
-    for generation_idx in range(GENERATION_COUNT):
-        #print('Gen:{} Pop:{}'.format(generation_idx, population[0]), file=sys.stderr)
-        weighted_population = []
-
-        fitness_array = []
-        for chromosome in population:
-            fitness_value = fitness(landing_height, position, speed, fuel, power, chromosome)
-            fitness_array.append(fitness_value)
-            weighted_population.append((chromosome, fitness_value))
-
-        text = '{:02d}\t'.format(generation_idx + 1)
-        text += ' '.join([format(int(item), '>3d') for item in fitness_array])
-        text += ' = {}'.format(int(sum(fitness_array)))
-        print(text, file=sys.stderr)
-
-        population = []
-
-        inherit_population_count = POPULATION_SIZE//2
-        if ELITISM:
-            inherit_population_count -= 1
-            elites = sorted(weighted_population, key=lambda item: item[1], reverse=True)[:2]
-            population = [item[0] for item in elites]
-
-        for _ in range(inherit_population_count):
-            chromosome1 = weighted_choice(weighted_population)
-            chromosome2 = weighted_choice(weighted_population)
+def breed(population, fitness_array, select=None, rng=None, metrics=NULL_METRICS, size=None, mutation_chance=None,
+          immigrants=0):
+    """Select, cross and mutate the next generation
+
+    ``select`` is one of the :mod:`marslander.selection` operators, defaults
+    to ``SELECTION``, and ``rng`` the :class:`marslander.rng.SolverRandom`
+    driving the selection and, through its ``generator``, the batched
+    :mod:`marslander.operators`. The ``select`` and ``breed`` phases are timed
+    in the ``metrics`` sink (see :mod:`marslander.metrics`). Returns the new
+    population and for every child the index of the parent in ``population``
+    it inherited its leading commands from.
+
+    The next generation has ``size`` chromosomes, ``POPULATION_SIZE`` by
+    default, mutated with ``mutation_chance``, ``MUTATION_CHANCE`` by
+    default, and its last ``immigrants`` children are replaced with random
+    chromosomes (see :mod:`marslander.adaptive`).
+    """
+    rng = rng or default_random()
+    mutation_chance = MUTATION_CHANCE if mutation_chance is None else mutation_chance
+    fitness_list = list(fitness_array)
+
+    inherit_population_count = (size or POPULATION_SIZE)//2
+    elites = []
+    if ELITISM:
+        inherit_population_count -= 1
+        elites = selection.elites(fitness_list, 2)
+
+    with metrics.timer('select'):
+        selected = (select or SELECTION)(fitness_list, 2 * inherit_population_count, rng=rng)
+    with metrics.timer('breed'):
+        children, parents = operators.next_generation(rng.generator, population, elites, selected[::2],
+                                                      selected[1::2], mutation_chance, random_genomes,
+                                                      CROSSOVER_POINTS)
+        immigrants = min(immigrants, len(children) - len(elites))
+        if immigrants > 0:
+            children[-immigrants:] = random_genomes(rng.generator, immigrants)
+    return children, parents
+
+
+def evolve(landing_height, position, speed, fuel, power, deadline=None, population=None, cache=None,
+           evaluator=None, rng=None, recorder=None, metrics=NULL_METRICS, controller=None):
+    """Run the genetic algorithm, yielding (chromosome, fitness) on every improvement
+
+    Without a ``deadline`` it runs ``GENERATION_COUNT`` generations, otherwise
+    it keeps breeding until the next generation would not finish before the
+    ``perf_counter()`` value ``deadline``. The last evaluated population is
+    the return value of the generator.
+
+    With an ``evaluator`` from :mod:`marslander.parallel` the population is
+    simulated in its workers, from scratch as checkpoints stay in the workers.
+
+    ``rng`` is a :class:`marslander.rng.SolverRandom` or a seed for one, the
+    same seed and population replay the same search. Every evaluated
+    generation is passed to the ``recorder``, e.g. a
+    :class:`marslander.convergence.ConvergenceRecorder`, and phase times and
+    counters to the ``metrics`` sink of :mod:`marslander.metrics`. The
+    ``early_terminations`` counter holds the simulated landers that stopped
+    before their last command.
+
+    An :class:`marslander.adaptive.AdaptiveController` as ``controller``
+    sets the size, mutation chance and immigrants of every next generation
+    and may end the search early once a landing is stable.
+    """
+    if not isinstance(rng, SolverRandom):
+        rng = default_random() if rng is None else SolverRandom(rng)
+    if population is None:
+        population = random_population(rng)
+    if evaluator is not None:
+        evaluator.set_scenario((landing_height, position, speed, fuel, power))
+    parent_population = parents = checkpoints = None
+    best_fitness = None
+    landed = False
+    generation_time = 0.
+
+    for generation_idx in itertools.count():
+        started = perf_counter()
+        hits = cache.hits if cache is not None else 0
+        with metrics.timer('simulate'):
+            if evaluator is None:
+                fitness_array, checkpoints = evaluate_generation(landing_height, position, speed, fuel, power,
+                                                                 population, parent_population, parents,
+                                                                 checkpoints, cache)
+                if metrics.enabled:
+                    ended = checkpoints[:, -2, 5]
+                    metrics.count('early_terminations', int(np.count_nonzero(
+                        (ended == FlyState.LANDED.value) | (ended == FlyState.CRASHED.value))))
+            else:
+                fitness_array = evaluate_population(landing_height, position, speed, fuel, power, population,
+                                                    cache, evaluator)
+        metrics.count('generations')
+        metrics.count('evaluations', len(population))
+        if cache is not None:
+            metrics.count('cache_hits', cache.hits - hits)
+        if recorder is not None:
+            recorder.record(generation_idx, fitness_array)
+        best_idx = int(np.argmax(fitness_array))
+        if best_fitness is None or fitness_array[best_idx] > best_fitness:
+            best_fitness = fitness_array[best_idx]
+            if controller is not None:
+                final_state, _ = simulate_final(landing_height, position, speed, fuel, power, population[best_idx])
+                landed = final_state[5] == FlyState.LANDED
+            yield population[best_idx], best_fitness
+
+        if controller is not None:
+            controller.update(generation_idx, fitness_array, landed)
+            if controller.stop:
+                metrics.count('early_stops')
+                return population
+
+        if deadline is None:
+            if generation_idx == GENERATION_COUNT:
+                return population
+        elif perf_counter() + generation_time > deadline:
+            return population
+
+        parent_population = population
+        if controller is None:
+            population, parents = breed(parent_population, fitness_array, rng=rng, metrics=metrics)
+        else:
+            population, parents = breed(parent_population, fitness_array, rng=rng, metrics=metrics,
+                                        size=controller.population_size, mutation_chance=controller.mutation_chance,
+                                        immigrants=controller.immigrants)
+            metrics.count('immigrants', controller.immigrants)
+        generation_time = max(generation_time, perf_counter() - started)
+
+
+def plan(landing_height, position, speed, fuel, power, deadline=None, population=None, cache=None, evaluator=None,
+         rng=None, metrics=NULL_METRICS, controller=None):
+    """Evolve ``population`` from the observed state for one rolling horizon turn
+
+    Returns the best chromosome, its fitness and the population to warm start
+    the next turn with (after :func:`shift_population`).
+    """
+    search = evolve(landing_height, position, speed, fuel, power, deadline, population, cache, evaluator, rng,
+                    metrics=metrics, controller=controller)
+    while True:
+        try:
+            best_chromosome, best_fitness = next(search)
+        except StopIteration as stop:
+            return best_chromosome, best_fitness, stop.value
 
-            chromosome1, chromosome2 = crossover(chromosome1, chromosome2)
 
-            population.append(mutate(chromosome1))
-            population.append(mutate(chromosome2))
+def get_best_trajectory(landing_height, position, speed, fuel, power, deadline=None, cache=None, evaluator=None,
+                        rng=None, metrics=NULL_METRICS):
+    if cache is None:
+        cache = FitnessCache()
 
-    best_chromosome = population[0]
-    best_fitness = fitness(landing_height, position, speed, fuel, power, best_chromosome)
-    for chromosome in population:
-        fitness_value = fitness(landing_height, position, speed, fuel, power, chromosome)
-        if fitness_value > best_fitness:
-            best_chromosome = chromosome
-            best_fitness = fitness_value
+    for best_chromosome, best_fitness in evolve(landing_height, position, speed, fuel, power, deadline,
+                                                cache=cache, evaluator=evaluator, rng=rng, metrics=metrics):
+        pass
 
     found = calculate_trajectory(landing_height, position, speed, fuel, power, best_chromosome)
 
-    print('Best solution:', file=sys.stderr)
-    print('chromosome: ' + str(decode_chromosome(best_chromosome)), file=sys.stderr)
-    print('fitness: ' + str(best_fitness), file=sys.stderr)
-    print('last state: ' + str(found[-1]), file=sys.stderr)
+    _logger.debug('best chromosome %s, fitness %s, last state %s, %s',
+                  decode_chromosome(best_chromosome), best_fitness, found[-1], cache)
 
     return found
 
 
-if __name__ == "__main__":
-    surface_n = int(input())
+def run(read=input, write=print, store=None, instant=False):
+    """Play the game, reading the referee's lines with ``read`` and answering with ``write``
+
+    With a :class:`marslander.store.SolutionStore` the first population is
+    seeded from the genomes stored for the surface and initial state, with
+    ``instant`` the first turn is answered from the best of them without a
+    search. The fittest genomes of the first turn are stored after it is
+    answered. Returns once ``read`` raises EOFError at the end of the game.
+    """
+    surface_n = int(read())
     surface = []
+    points = []
     for i in range(surface_n):
-        land_x, land_y = [int(j) for j in input().split()]
+        land_x, land_y = [int(j) for j in read().split()]
         surface.append(land_y)
+        points.append((land_x, land_y))
 
     # find the landing zone (height only for now)
     landing_zone = 0
@@ -249,14 +747,52 @@ if __name__ == "__main__":
     # To debug: print("Debug messages...", file=sys.stderr)
 
     best_trajectory = None
+    population = None
+    initial_state = None
+    cache = FitnessCache()
     while True:
-        x, y, h_speed, v_speed, actual_fuel, rotate, actual_power = [int(i) for i in input().split()]
+        try:
+            line = read()
+        except EOFError:
+            return
+        x, y, h_speed, v_speed, actual_fuel, rotate, actual_power = [int(i) for i in line.split()]
+        first_turn = initial_state is None
+        if first_turn:
+            initial_state = (x, y, h_speed, v_speed, actual_fuel, rotate, actual_power)
+        deadline = perf_counter() + (FIRST_TURN_TIME if first_turn else TURN_TIME)
+
+        if ROLLING_HORIZON:
+            if not first_turn:
+                population = shift_population(population)
+            elif store is not None:
+                stored = store.get(SOLVER_NAME, points, initial_state)
+                if stored:
+                    population = seed_population([genome for genome, _ in stored])
+                    if instant:
+                        write('0 {}'.format(population[0, 0, 0]))
+                        continue
+            best_chromosome, _, population = plan(landing_zone, y, v_speed, actual_fuel, actual_power, deadline,
+                                                  population, cache)
+            write('0 {}'.format(best_chromosome[0, 0]))
+            if first_turn and store is not None:
+                fitness_array = evaluate_population(landing_zone, y, v_speed, actual_fuel, actual_power, population,
+                                                    cache)
+                store.put(SOLVER_NAME, points, initial_state, zip(population, fitness_array))
+            continue
 
         if best_trajectory is None:
-            best_trajectory = get_best_trajectory(landing_zone, y, v_speed, actual_fuel, actual_power)
+            best_trajectory = get_best_trajectory(landing_zone, y, v_speed, actual_fuel, actual_power, deadline)
 
         if len(best_trajectory) > 0:
             cmd = best_trajectory.pop(0)[4]
-            print('0 {}'.format(cmd))
+            write('0 {}'.format(cmd))
         else:
-            print('0 0')
+            write('0 0')
+
+
+if __name__ == "__main__":
+    if os.environ.get('MARSLANDER_STORE'):
+        from marslander.store import SolutionStore
+        run(store=SolutionStore(os.environ['MARSLANDER_STORE']))
+    else:
+        run()
@@ -1,12 +1,16 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import sys
+import os
 import math
-import random
-import numpy as np
+import itertools
 from enum import Enum
-from copy import deepcopy
+from time import perf_counter
+
+from marslander import selection
+from marslander.cache import FitnessCache
+from marslander.metrics import NULL_METRICS
+from marslander.rng import SolverRandom, default_random
 
 POWER_MIN = 0
 POWER_MAX = 4
@@ -14,15 +18,39 @@ POWER_LIMIT = 1
 ROTATION_MIN = -90
 ROTATION_MAX = 90
 ROTATION_LIMIT = 15
-GRAVITY = np.array([0, -3.711])
+GRAVITY = -3.711
 WIDTH_MAX = 7000
 HEIGHT_MAX = 3000
+LANDING_H_SPEED = 20
+LANDING_V_SPEED = 40
 
 CHROMOSOME_SIZE = 100
 POPULATION_SIZE = 20
 GENERATION_COUNT = 100
 MUTATION_CHANCE = 0.01
+CROSSOVER_POINTS = 2
 ELITISM = True
+SELECTION = selection.roulette
+BATCHED_BREEDING = False    # NumPy operators, pure Python keeps NumPy out of the first turn
+ROLLING_HORIZON = True
+PRUNING = True      # evaluation decides hopeless landers as soon as a step makes them so
+SOLVER_NAME = 'marslander2'     # key of the solver's genomes in a marslander.store.SolutionStore
+
+SURFACE_CELL_WIDTH = 100
+
+FIRST_TURN_TIME = 0.9   # seconds, the referee allows 1 s for the first turn
+TURN_TIME = 0.08        # and 100 ms for every other one
+
+
+# thrust vector of every (angle, power) command, THRUST[angle - ROTATION_MIN][power]
+THRUST = [[(-power * math.sin(math.radians(angle)), power * math.cos(math.radians(angle)))
+           for power in range(POWER_MIN, POWER_MAX + 1)]
+          for angle in range(ROTATION_MIN, ROTATION_MAX + 1)]
+
+
+def referee_round(value):
+    """Round half up like the referee does for reported values"""
+    return math.floor(value + 0.5)
 
 
 class FlyState(Enum):
@@ -33,14 +61,166 @@ class FlyState(Enum):
 
 
 class State:
-    def __init__(self):
+    __slots__ = ('step', 'x', 'y', 'h_speed', 'v_speed', 'fuel', 'angle', 'power', 'fly_state')
+
+    def __init__(self, x=0., y=0., h_speed=0., v_speed=0., fuel=0, angle=0, power=0, fly_state=FlyState.CRASHED):
         self.step = 1
-        self.position = [0, 0]
-        self.velocity = [0, 0]
-        self.fuel = 0
-        self.angle = 0
-        self.power = 0
-        self.fly_state = FlyState.CRASHED
+        self.x = x
+        self.y = y
+        self.h_speed = h_speed
+        self.v_speed = v_speed
+        self.fuel = fuel
+        self.angle = angle
+        self.power = power
+        self.fly_state = fly_state
+
+    def reported(self):
+        """The state as the referee reports it: x, y, h_speed, v_speed, fuel, angle, power"""
+        return (referee_round(self.x), referee_round(self.y), referee_round(self.h_speed),
+                referee_round(self.v_speed), self.fuel, self.angle, self.power)
+
+    def __repr__(self):
+        return 'State({}, {:.1f}, {:.1f}, {:.1f}, {:.1f}, {}, {}, {}, {})'.format(
+            self.step, self.x, self.y, self.h_speed, self.v_speed, self.fuel, self.angle, self.power,
+            self.fly_state.name)
+
+
+class Trajectory:
+    """Preallocated structure-of-arrays buffer of simulated states
+
+    One column per :class:`State` attribute, ``length`` rows are valid. The
+    buffer is reused between simulations, so keep one per caller and index it
+    (or iterate it) to materialize :class:`State` objects only when needed.
+    """
+    __slots__ = ('length', 'x', 'y', 'h_speed', 'v_speed', 'fuel', 'angle', 'power', 'fly_state')
+
+    def __init__(self, capacity=CHROMOSOME_SIZE + 1):
+        self.length = 0
+        self.x = [0.] * capacity
+        self.y = [0.] * capacity
+        self.h_speed = [0.] * capacity
+        self.v_speed = [0.] * capacity
+        self.fuel = [0] * capacity
+        self.angle = [0] * capacity
+        self.power = [0] * capacity
+        self.fly_state = [FlyState.FLYING] * capacity
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += self.length
+        if not 0 <= idx < self.length:
+            raise IndexError('trajectory index out of range')
+        state = State(self.x[idx], self.y[idx], self.h_speed[idx], self.v_speed[idx], self.fuel[idx],
+                      self.angle[idx], self.power[idx], self.fly_state[idx])
+        state.step = idx + 1
+        return state
+
+    def copy_prefix(self, other, length):
+        """Overwrite this buffer with the first ``length`` states of ``other``"""
+        self.x[:length] = other.x[:length]
+        self.y[:length] = other.y[:length]
+        self.h_speed[:length] = other.h_speed[:length]
+        self.v_speed[:length] = other.v_speed[:length]
+        self.fuel[:length] = other.fuel[:length]
+        self.angle[:length] = other.angle[:length]
+        self.power[:length] = other.power[:length]
+        self.fly_state[:length] = other.fly_state[:length]
+        self.length = length
+
+    def record(self, state):
+        idx = self.length
+        if idx == len(self.x):
+            raise IndexError('trajectory buffer is full')
+        self.x[idx] = state.x
+        self.y[idx] = state.y
+        self.h_speed[idx] = state.h_speed
+        self.v_speed[idx] = state.v_speed
+        self.fuel[idx] = state.fuel
+        self.angle[idx] = state.angle
+        self.power[idx] = state.power
+        self.fly_state[idx] = state.fly_state
+        self.length = idx + 1
+
+
+class Surface:
+    """Terrain polyline indexed for constant time collision checks
+
+    ``heights`` holds the terrain height at every integer x and ``cells``
+    the indices of the segments overlapping each ``SURFACE_CELL_WIDTH`` wide
+    column, so a step only tests the few segments below it. ``floor`` and
+    ``top`` are the lowest and the highest terrain height. A Surface can be
+    passed wherever a landing zone is expected to collide with the whole
+    terrain instead of the landing zone rectangle.
+    """
+    __slots__ = ('points', 'landing_zone', 'heights', 'cells', 'floor', 'top')
+
+    def __init__(self, points):
+        self.points = tuple((x, y) for x, y in points)
+        self.landing_zone = calculate_landing_zone(self.points)
+        self.floor = min(y for _, y in self.points)
+        self.top = max(y for _, y in self.points)
+        self.heights = [0.] * (WIDTH_MAX + 1)
+        self.cells = [[] for _ in range(WIDTH_MAX // SURFACE_CELL_WIDTH + 1)]
+
+        for segment_idx, ((x0, y0), (x1, y1)) in enumerate(zip(self.points, self.points[1:])):
+            for column in range(max(x0, 0), min(x1, WIDTH_MAX) + 1):
+                self.heights[column] = y0 + (y1 - y0) * (column - x0) / (x1 - x0)
+            for cell in range(max(x0, 0) // SURFACE_CELL_WIDTH, min(x1, WIDTH_MAX) // SURFACE_CELL_WIDTH + 1):
+                self.cells[cell].append(segment_idx)
+
+    def __iter__(self):
+        return iter(self.points)
+
+    def __eq__(self, other):
+        return isinstance(other, Surface) and self.points == other.points
+
+    def __hash__(self):
+        return hash(self.points)
+
+    def height(self, x):
+        """Terrain height at ``x``, interpolated between integer columns"""
+        x = min(max(x, 0), WIDTH_MAX)
+        column = int(x)
+        if column == WIDTH_MAX:
+            return self.heights[column]
+        return self.heights[column] + (self.heights[column + 1] - self.heights[column]) * (x - column)
+
+    def is_below(self, x, y):
+        return y < self.height(x)
+
+    def intersect(self, x0, y0, x1, y1):
+        """First contact of the step from (x0, y0) to (x1, y1) with the terrain
+
+        Returns the (x, y) of the contact closest to the start, or None when
+        the step stays above the terrain.
+        """
+        first_cell = int(min(max(min(x0, x1), 0), WIDTH_MAX)) // SURFACE_CELL_WIDTH
+        last_cell = int(min(max(max(x0, x1), 0), WIDTH_MAX)) // SURFACE_CELL_WIDTH
+        dx = x1 - x0
+        dy = y1 - y0
+        contact = None
+        contact_t = 2.
+        for cell in range(first_cell, last_cell + 1):
+            for segment_idx in self.cells[cell]:
+                (sx0, sy0), (sx1, sy1) = self.points[segment_idx], self.points[segment_idx + 1]
+                sdx = sx1 - sx0
+                sdy = sy1 - sy0
+                denominator = dx * sdy - dy * sdx
+                if denominator == 0:
+                    continue
+                qx = sx0 - x0
+                qy = sy0 - y0
+                t = (qx * sdy - qy * sdx) / denominator
+                u = (qx * dy - qy * dx) / denominator
+                if 0 <= t <= 1 and 0 <= u <= 1 and t < contact_t:
+                    contact_t = t
+                    contact = (x0 + t * dx, y0 + t * dy)
+        if contact is None and self.is_below(x1, y1):
+            contact = (x1, y1)
+        return contact
 
 
 def trim(value, limit):
@@ -52,162 +232,572 @@ def trim(value, limit):
         return value
 
 
-def rotate_vector(vector, angle):
-    radians = math.radians(angle)
-    result = [None] * 2
-    result[0] = (vector[0] * math.cos(radians) - vector[1] * math.sin(radians)) * -1
-    result[1] = vector[0] * math.sin(radians) + vector[1] * math.cos(radians)
-    return np.array(result)
-
-
-def calculate_trajectory(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, chromosome):
-    state = State()
-    state.step = 1
-    state.position = [x, y]
-    state.velocity = [h_speed, v_speed]
-    state.fuel = fuel
-    state.angle = rotate
-    state.power = power
-    state.fly_state = FlyState.FLYING
-
-    states = [state]
-    for gene in chromosome:
-        new_state = deepcopy(state)
-
-        new_state.angle += trim(gene[0] - state.angle, ROTATION_LIMIT)
-        new_state.power += trim(gene[1] - state.power, POWER_LIMIT)
-        new_state.fuel -= new_state.power
-        thrust = rotate_vector(np.array([0., 1.]) * new_state.power, new_state.angle)
-        if new_state.fuel <= 0:
-            thrust = 0
-        new_state.velocity += GRAVITY + thrust
-        new_state.position += new_state.velocity
-        new_state.step += 1
-        new_state.fly_state = FlyState.FLYING
-
-        if new_state.position[0] < 0 or new_state.position[0] > WIDTH_MAX or new_state.position[1] > HEIGHT_MAX:
-            new_state.fly_state = FlyState.LOST
-        #elif new_state.position < landing_zone[1]:
-        elif (landing_zone[0][0] <= new_state.position[0] <= landing_zone[1][0] and
-             landing_zone[0][1] >= new_state.position[1]):
-            speed = np.linalg.norm(new_state.velocity)
-            new_state.fly_state = FlyState.LANDED if speed > 30 else FlyState.CRASHED
-        elif (new_state.position[1] < landing_zone[0][1]):
-            new_state.fly_state = FlyState.CRASHED
-
-        states.append(new_state)
-
-        if new_state.fly_state != FlyState.FLYING:
+def step(state, rotation, power, landing_zone):
+    """Advance ``state`` in place by one turn of the (rotation, power) gene
+
+    Follows the referee: power is limited by the fuel left, the position moves
+    by the mean of the old and the new speed and the thrust vector comes from
+    the precomputed ``THRUST`` table.
+    """
+    x0 = state.x
+    y0 = state.y
+    state.angle += trim(rotation - state.angle, ROTATION_LIMIT)
+    state.power += trim(power - state.power, POWER_LIMIT)
+    if state.power > state.fuel:
+        state.power = state.fuel
+    state.fuel -= state.power
+    thrust_x, thrust_y = THRUST[state.angle - ROTATION_MIN][state.power]
+    acceleration_y = GRAVITY + thrust_y
+    state.x += state.h_speed + 0.5 * thrust_x
+    state.y += state.v_speed + 0.5 * acceleration_y
+    state.h_speed += thrust_x
+    state.v_speed += acceleration_y
+    state.step += 1
+
+    if state.x < 0 or state.x > WIDTH_MAX or state.y > HEIGHT_MAX:
+        state.fly_state = FlyState.LOST
+    elif isinstance(landing_zone, Surface):
+        contact = landing_zone.intersect(x0, y0, state.x, state.y)
+        if contact is not None:
+            flat = landing_zone.landing_zone[0][0] <= contact[0] <= landing_zone.landing_zone[1][0]
+            state.fly_state = FlyState.LANDED if flat and is_landing_safe(state) else FlyState.CRASHED
+    elif landing_zone[0][0] <= state.x <= landing_zone[1][0] and landing_zone[0][1] >= state.y:
+        state.fly_state = FlyState.LANDED if is_landing_safe(state) else FlyState.CRASHED
+    elif state.y < landing_zone[0][1]:
+        state.fly_state = FlyState.CRASHED
+
+
+def is_landing_safe(state):
+    return (state.angle == 0 and abs(state.h_speed) <= LANDING_H_SPEED and
+            abs(state.v_speed) <= LANDING_V_SPEED)
+
+
+def terrain_range(landing_zone):
+    """(lowest, highest) height a lander can collide at"""
+    if isinstance(landing_zone, Surface):
+        return landing_zone.floor, landing_zone.top
+    return landing_zone[0][1], landing_zone[0][1]
+
+
+def _crossing_step(height, v_speed, acceleration):
+    """First step ``k`` at which ``height + k * v_speed + acceleration * k * k / 2`` drops below zero, None if never"""
+    discriminant = v_speed ** 2 - 2 * acceleration * height
+    if discriminant < 0:
+        return None
+    k = max(int(math.floor((-v_speed - math.sqrt(discriminant)) / acceleration)) + 1, 1)
+    return k if height + k * v_speed + acceleration * k * k / 2 < 0 else None
+
+
+def _braking_impact(y, v_speed, fuel, power, floor):
+    """(steps, speed) a lander braking as hard as it can hits ``floor`` after, None if it can slow down to land"""
+    steps = 0
+    while power < POWER_MAX or fuel < POWER_MAX:
+        if fuel == 0:
+            crossing = _crossing_step(y - floor, v_speed, GRAVITY)
+            return None if crossing is None else (steps + crossing, v_speed + crossing * GRAVITY)
+        power = min(power + POWER_LIMIT, POWER_MAX, fuel)
+        fuel -= power
+        acceleration = GRAVITY + power
+        y += v_speed + 0.5 * acceleration
+        v_speed += acceleration
+        steps += 1
+        if v_speed >= -LANDING_V_SPEED:
+            return None
+        if y < floor:
+            return steps, v_speed
+
+    acceleration = GRAVITY + POWER_MAX
+    full_steps = fuel // POWER_MAX
+    slow = math.ceil((-LANDING_V_SPEED - v_speed) / acceleration)
+    crossing = _crossing_step(y - floor, v_speed, acceleration)
+    if crossing is not None and crossing < slow and crossing <= full_steps:
+        return steps + crossing, v_speed + crossing * acceleration
+    if slow <= full_steps:
+        return None
+    impact = _braking_impact(y + full_steps * v_speed + acceleration * full_steps * full_steps / 2,
+                             v_speed + full_steps * acceleration, fuel - full_steps * POWER_MAX, POWER_MAX, floor)
+    return None if impact is None else (steps + full_steps + impact[0], impact[1])
+
+
+def prune(state, floor, top, remaining):
+    """Decide a flying ``state`` that can no longer land, in place
+
+    A lander above the ``top`` of the terrain that passes ``HEIGHT_MAX`` even
+    with the engine off is LOST. A lander falling faster than
+    ``LANDING_V_SPEED`` that still hits the ``floor`` of the terrain too fast
+    when its power ramps up as fast as its fuel allows, thrusting straight
+    up, is CRASHED with its ``v_speed`` set to the impact speed of that
+    braking, unless its horizontal speed and thrust could carry it out of the
+    zone first. Both bounds are optimistic and only decide a lander reaching
+    them within the ``remaining`` genes, so a pruned lander ends up with the
+    same fly state when simulated to the end.
+
+    Returns:
+      bool: True when the state was decided
+    """
+    v_speed = state.v_speed
+    if v_speed > 0:
+        if state.y < top:
+            return False
+        steps = _crossing_step(HEIGHT_MAX - state.y, -v_speed, -GRAVITY)
+        if steps is None or steps > remaining:
+            return False
+        state.fly_state = FlyState.LOST
+        return True
+    if v_speed >= -LANDING_V_SPEED:
+        return False
+    impact = _braking_impact(state.y, v_speed, state.fuel, state.power, floor)
+    if impact is None:
+        return False
+    steps, impact_speed = impact
+    reach = abs(state.h_speed) * steps + POWER_MAX * steps * steps / 2
+    if steps > remaining or state.x < reach or state.x + reach > WIDTH_MAX:
+        return False
+    state.v_speed = impact_speed
+    state.fly_state = FlyState.CRASHED
+    return True
+
+
+def simulate_final(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, chromosome, pruning=False):
+    """Simulate without recording, returns the terminal state and the step count
+
+    With ``pruning`` a lander :func:`prune` decides stops at the step it was
+    decided at.
+    """
+    floor, top = terrain_range(landing_zone)
+    state = State(x, y, h_speed, v_speed, fuel, rotate, power, FlyState.FLYING)
+    for gene_idx, (rotation, gene_power) in enumerate(chromosome):
+        step(state, rotation, gene_power, landing_zone)
+        if pruning and state.fly_state == FlyState.FLYING:
+            prune(state, floor, top, len(chromosome) - gene_idx - 1)
+        if state.fly_state != FlyState.FLYING:
             break
+    return state, state.step - 1
+
+
+def calculate_trajectory(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, chromosome, trajectory=None,
+                         pruning=False):
+    if trajectory is None:
+        trajectory = Trajectory(len(chromosome) + 1)
+    trajectory.length = 0
+    floor, top = terrain_range(landing_zone)
+
+    state = State(x, y, h_speed, v_speed, fuel, rotate, power, FlyState.FLYING)
+    trajectory.record(state)
+    for gene_idx, (rotation, gene_power) in enumerate(chromosome):
+        step(state, rotation, gene_power, landing_zone)
+        if pruning and state.fly_state == FlyState.FLYING:
+            prune(state, floor, top, len(chromosome) - gene_idx - 1)
+        trajectory.record(state)
+        if state.fly_state != FlyState.FLYING:
+            break
+
+    return trajectory
 
-        state = new_state
 
-    return states
+def resume_trajectory(parent, chromosome, start, landing_zone, trajectory, pruning=False):
+    """Trajectory of ``chromosome`` sharing its first ``start`` genes with the one of ``parent``
+
+    The states up to gene ``start`` are copied from the ``parent`` trajectory
+    and only the remaining genes are simulated into ``trajectory``.
+    """
+    start = min(start, len(parent) - 1)
+    trajectory.copy_prefix(parent, start + 1)
+    state = trajectory[start]
+    if state.fly_state == FlyState.FLYING:
+        floor, top = terrain_range(landing_zone)
+        for gene_idx, (rotation, gene_power) in enumerate(chromosome[start:], start):
+            step(state, rotation, gene_power, landing_zone)
+            if pruning and state.fly_state == FlyState.FLYING:
+                prune(state, floor, top, len(chromosome) - gene_idx - 1)
+            trajectory.record(state)
+            if state.fly_state != FlyState.FLYING:
+                break
+    return trajectory
 
 
 def fitness(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, chromosome):
-    result = None
-    trajectory = calculate_trajectory(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, chromosome)
+    last_state, _ = simulate_final(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, chromosome, PRUNING)
+    return state_fitness(last_state)
 
-    print(trajectory, file=sys.stderr)
 
-    last_state = trajectory[-1]
-    if last_state[5] == FlyState.LANDED:
-        result = last_state[3]
-    elif last_state[5] == FlyState.FLYING:
-        # result = 1-((last_state[1] - landing_height)/3000)
+def state_fitness(last_state):
+    if last_state.fly_state == FlyState.LANDED:
+        result = last_state.fuel
+    elif last_state.fly_state == FlyState.FLYING:
+        # result = 1-((last_state.y - landing_height)/3000)
         result = 0.5
-    elif last_state[1] > HEIGHT_MAX:
+    elif last_state.fly_state == FlyState.LOST:
         result = 0
     else:
-        result = 200 / -last_state[2]
+        result = 200 / -last_state.v_speed
 
-    '''
-    print('y:{} s:{} f:{} = {}'.format(int(last_state[1]), int(last_state[2]), int(last_state[3]), int(result)),
-          file=sys.stderr)
-    '''
     return result
 
 
-def random_population():
+def evaluate_population(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, population, cache=None,
+                        evaluator=None):
+    """Fitness list of ``population``
+
+    Chromosomes found in ``cache`` are not simulated, the rest is simulated
+    here or handed to ``evaluator`` (see :mod:`marslander.parallel`).
+    """
+    def simulate(chromosomes):
+        if evaluator is not None:
+            return evaluator(chromosomes)
+        return [fitness(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, chromosome)
+                for chromosome in chromosomes]
+
+    if cache is None:
+        return simulate(population)
+
+    scenario = (x, y, h_speed, v_speed, fuel, rotate, power, tuple(landing_zone))
+    keys = [(scenario, tuple(chromosome)) for chromosome in population]
+    fitness_array = [cache.get(key) for key in keys]
+    missing = [idx for idx, fitness_value in enumerate(fitness_array) if fitness_value is None]
+    if missing:
+        for idx, fitness_value in zip(missing, simulate([population[idx] for idx in missing])):
+            fitness_array[idx] = fitness_value
+            cache.put(keys[idx], fitness_value)
+    return fitness_array
+
+
+def evaluate_generation(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, population,
+                        parent_population=None, parents=None, parent_trajectories=None, cache=None, buffers=None):
+    """Evaluate ``population`` resuming every child from its parent's trajectory
+
+    ``parents`` holds for each chromosome the index of the parent in
+    ``parent_population`` it shares its leading genes with, only genes from
+    the first differing one are simulated. Trajectories are written into the
+    reusable ``buffers`` when given. Returns the fitness list and the
+    trajectories of ``population``, None for those answered by the cache.
+    """
+    if cache is not None:
+        scenario = (x, y, h_speed, v_speed, fuel, rotate, power, tuple(landing_zone))
+    fitness_array = []
+    trajectories = []
+    for idx, chromosome in enumerate(population):
+        parent = parent_trajectory = None
+        if parent_population is not None:
+            parent = parent_population[parents[idx]]
+            parent_trajectory = parent_trajectories[parents[idx]]
+
+        if cache is not None and chromosome is not parent:
+            key = (scenario, tuple(chromosome))
+            fitness_value = cache.get(key)
+            if fitness_value is not None:
+                fitness_array.append(fitness_value)
+                trajectories.append(None)
+                continue
+
+        trajectory = buffers[idx] if buffers is not None and idx < len(buffers) else Trajectory()
+        if parent_trajectory is None:
+            calculate_trajectory(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, chromosome, trajectory,
+                                 PRUNING)
+        else:
+            start = next((gene_idx for gene_idx, (gene, parent_gene) in enumerate(zip(chromosome, parent))
+                          if gene != parent_gene), len(chromosome))
+            resume_trajectory(parent_trajectory, chromosome, start, landing_zone, trajectory, PRUNING)
+
+        fitness_value = state_fitness(trajectory[-1])
+        if cache is not None and chromosome is not parent:
+            cache.put(key, fitness_value)
+        fitness_array.append(fitness_value)
+        trajectories.append(trajectory)
+
+    return fitness_array, trajectories
+
+
+def random_gene(rng=None):
+    rng = rng or default_random()
+    rotation = (rng.randint(1, 13) - 7) * 15
+    power = rng.randint(POWER_MIN, POWER_MAX)
+    return rotation, power
+
+
+def random_population(rng=None):
+    rng = rng or default_random()
     population = []
     for i in range(POPULATION_SIZE):
         chromosome = []
         for j in range(CHROMOSOME_SIZE):
-            rotation = (random.randint(1, 13) - 7) * 15
-            power = random.randint(POWER_MIN, POWER_MAX)
-            chromosome.append((rotation, power))
+            chromosome.append(random_gene(rng))
 
         population.append(chromosome)
     return population
 
 
-def get_best_trajectory(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone):
-    population = random_population()
-    for generation_idx in range(GENERATION_COUNT):
-        weighted_population = []
-        fitness_array = []
-        for chromosome in population:
-            fitness_value = fitness(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, chromosome)
-            fitness_array.append(fitness_value)
-            weighted_population.append((chromosome, fitness_value))
-
-        text = '{:02d}\t'.format(generation_idx + 1)
-        text += ' '.join([format(int(item), '>3d') for item in fitness_array])
-        text += ' = {}'.format(int(sum(fitness_array)))
-        print(text, file=sys.stderr)
-
-        population = []
-
-        inherit_population_count = POPULATION_SIZE//2
-        if ELITISM:
-            inherit_population_count -= 1
-            elites = sorted(weighted_population, key=lambda item: item[1], reverse=True)[:2]
-            population = [item[0] for item in elites]
-
-        '''
-        for _ in range(inherit_population_count):
-            chromosome1 = weighted_choice(weighted_population)
-            chromosome2 = weighted_choice(weighted_population)
-
-            chromosome1, chromosome2 = crossover(chromosome1, chromosome2)
-
-            population.append(mutate(chromosome1))
-            population.append(mutate(chromosome2))
-        '''
-
-    best_chromosome = population[0]
-    best_fitness = fitness(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, chromosome)
-    for chromosome in population:
-        fitness_value = fitness(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, chromosome)
-        if fitness_value > best_fitness:
-            best_chromosome = chromosome
-            best_fitness = fitness_value
-
-    '''
-    found = calculate_trajectory(landing_height, position, speed, fuel, power, best_chromosome)
-
-    print('Best solution:', file=sys.stderr)
-    print('chromosome: ' + str(decode_chromosome(best_chromosome)), file=sys.stderr)
-    print('fitness: ' + str(best_fitness), file=sys.stderr)
-    print('last state: ' + str(found[-1]), file=sys.stderr)
+def seed_population(genomes, rng=None):
+    """Population starting with ``genomes``, fittest first, padded with random chromosomes
+
+    Genomes of a different length, e.g. stored before ``CHROMOSOME_SIZE``
+    changed, are skipped.
+    """
+    population = random_population(rng)
+    seeded = [genome for genome in genomes if len(genome) == CHROMOSOME_SIZE][:POPULATION_SIZE]
+    for idx, genome in enumerate(seeded):
+        population[idx] = [tuple(gene) for gene in genome]
+    return population
+
+
+def random_genomes(rng, count):
+    """``count`` random chromosomes drawn from the numpy.random.Generator ``rng``"""
+    import numpy as np
+
+    genomes = np.empty((count, CHROMOSOME_SIZE, 2), dtype=np.int16)
+    genomes[:, :, 0] = (rng.integers(1, 14, size=(count, CHROMOSOME_SIZE)) - 7) * 15
+    genomes[:, :, 1] = rng.integers(POWER_MIN, POWER_MAX + 1, size=(count, CHROMOSOME_SIZE))
+    return genomes
+
+
+def shift_population(population, rng=None):
+    """Drop the gene executed this turn from every chromosome and pad a random one"""
+    rng = rng or default_random()
+    return [chromosome[1:] + [random_gene(rng)] for chromosome in population]
+
+
+def _mutation_gap(rng, chance):
+    """Gene fields skipped before the next mutation, geometrically distributed"""
+    if chance >= 1:
+        return 0
+    return int(math.log(1. - rng.random()) / math.log(1. - chance))
+
+
+def crossover(chromosome1, chromosome2, rng=None, points=CROSSOVER_POINTS):
+    """Swap every other run of genes between ``points`` random cuts
+
+    Returns:
+      tuple: children starting like ``chromosome1`` and like ``chromosome2``
+    """
+    rng = rng or default_random()
+    size = len(chromosome1)
+    cuts = sorted(rng.randrange(size) for _ in range(points)) + [size]
+    child1 = list(chromosome1)
+    child2 = list(chromosome2)
+    for start, end in zip(cuts[::2], cuts[1::2]):
+        child1[start:end] = chromosome2[start:end]
+        child2[start:end] = chromosome1[start:end]
+    return child1, child2
+
+
+def mutate(chromosome, rng=None, chance=MUTATION_CHANCE):
+    """Replace each rotation and power of ``chromosome`` with probability ``chance``
+
+    Only the mutated fields are drawn, skipping the unchanged ones with
+    geometrically distributed gaps, so an unmutated chromosome costs a single
+    random number and is returned as is.
+    """
+    if chance <= 0:
+        return chromosome
+    rng = rng or default_random()
+    fields = 2 * len(chromosome)
+    position = _mutation_gap(rng, chance)
+    if position >= fields:
+        return chromosome
+    mutated = list(chromosome)
+    while position < fields:
+        gene_idx, field = divmod(position, 2)
+        rotation, power = mutated[gene_idx]
+        if field == 0:
+            rotation = (rng.randint(1, 13) - 7) * 15
+        else:
+            power = rng.randint(POWER_MIN, POWER_MAX)
+        mutated[gene_idx] = (rotation, power)
+        position += 1 + _mutation_gap(rng, chance)
+    return mutated
+
+
+def random_chromosome(rng=None):
+    rng = rng or default_random()
+    return [random_gene(rng) for _ in range(CHROMOSOME_SIZE)]
+
+
+def breed(population, fitness_array, select=None, rng=None, metrics=NULL_METRICS, size=None, mutation_chance=None,
+          immigrants=0):
+    """Select, cross and mutate the next generation
+
+    ``select`` is one of the :mod:`marslander.selection` operators, defaults
+    to ``SELECTION``, and ``rng`` the :class:`marslander.rng.SolverRandom`
+    driving the selection, the scalar :func:`crossover` and :func:`mutate`
+    or, with ``BATCHED_BREEDING`` and through its ``generator``, the batched
+    :mod:`marslander.operators`. The ``select`` and ``breed`` phases are timed
+    in the ``metrics`` sink (see :mod:`marslander.metrics`). Returns the new
+    population and for every child the index of the parent in ``population``
+    it shares its leading genes with.
+
+    The next generation has ``size`` chromosomes, ``POPULATION_SIZE`` by
+    default, mutated with ``mutation_chance``, ``MUTATION_CHANCE`` by
+    default, and its last ``immigrants`` children are replaced with random
+    chromosomes (see :mod:`marslander.adaptive`).
+    """
+    rng = rng or default_random()
+    mutation_chance = MUTATION_CHANCE if mutation_chance is None else mutation_chance
+
+    inherit_population_count = (size or POPULATION_SIZE)//2
+    elites = []
+    if ELITISM:
+        inherit_population_count -= 1
+        elites = selection.elites(fitness_array, 2)
+
+    with metrics.timer('select'):
+        selected = (select or SELECTION)(fitness_array, 2 * inherit_population_count, rng=rng)
+    with metrics.timer('breed'):
+        if not BATCHED_BREEDING:
+            children = [population[idx] for idx in elites]
+            parents = list(elites)
+            for idx1, idx2 in zip(selected[::2], selected[1::2]):
+                child1, child2 = crossover(population[idx1], population[idx2], rng)
+                children += [mutate(child1, rng, mutation_chance), mutate(child2, rng, mutation_chance)]
+                parents += [idx1, idx2]
+        else:
+            import numpy as np
+            from marslander import operators
+
+            genomes, parents = operators.next_generation(rng.generator, np.array(population, dtype=np.int16), elites,
+                                                         selected[::2], selected[1::2], mutation_chance,
+                                                         random_genomes, CROSSOVER_POINTS)
+            children = [population[idx] for idx in elites]
+            children += [list(map(tuple, chromosome)) for chromosome in genomes[len(elites):].tolist()]
+            parents = parents.tolist()
+        for idx in range(max(len(children) - immigrants, len(elites)), len(children)):
+            children[idx] = random_chromosome(rng)
+    return children, parents
+
+
+def evolve(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, deadline=None, population=None, cache=None,
+           evaluator=None, rng=None, recorder=None, metrics=NULL_METRICS, controller=None):
+    """Run the genetic algorithm, yielding (chromosome, fitness) on every improvement
+
+    Without a ``deadline`` it runs ``GENERATION_COUNT`` generations, otherwise
+    it keeps breeding until the next generation would not finish before the
+    ``perf_counter()`` value ``deadline``. The last evaluated population is
+    the return value of the generator. With an ``evaluator`` from
+    :mod:`marslander.parallel` the population is simulated in its workers.
+
+    ``rng`` is a :class:`marslander.rng.SolverRandom` or a seed for one, the
+    same seed and population replay the same search. Every evaluated
+    generation is passed to the ``recorder``, e.g. a
+    :class:`marslander.convergence.ConvergenceRecorder`, and phase times and
+    counters to the ``metrics`` sink of :mod:`marslander.metrics`. The
+    ``early_terminations`` counter holds the simulated landers that stopped
+    before their last gene.
+
+    An :class:`marslander.adaptive.AdaptiveController` as ``controller``
+    sets the size, mutation chance and immigrants of every next generation
+    and may end the search early once a landing is stable.
+    """
+    if not isinstance(rng, SolverRandom):
+        rng = default_random() if rng is None else SolverRandom(rng)
+    if population is None:
+        population = random_population(rng)
+    if evaluator is not None:
+        evaluator.set_scenario((x, y, h_speed, v_speed, fuel, rotate, power, landing_zone))
+    parent_population = parents = trajectories = buffers = None
+    best_fitness = None
+    landed = False
+    generation_time = 0.
+
+    for generation_idx in itertools.count():
+        started = perf_counter()
+        hits = cache.hits if cache is not None else 0
+        with metrics.timer('simulate'):
+            if evaluator is None:
+                spare = [trajectory for trajectory in trajectories or () if trajectory is not None]
+                fitness_array, trajectories = evaluate_generation(x, y, h_speed, v_speed, fuel, rotate, power,
+                                                                  landing_zone, population, parent_population,
+                                                                  parents, trajectories, cache, buffers)
+                buffers = spare
+                if metrics.enabled:
+                    metrics.count('early_terminations', sum(
+                        1 for chromosome, trajectory in zip(population, trajectories)
+                        if trajectory is not None and len(trajectory) <= len(chromosome)))
+            else:
+                fitness_array = evaluate_population(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone,
+                                                    population, cache, evaluator)
+        metrics.count('generations')
+        metrics.count('evaluations', len(population))
+        if cache is not None:
+            metrics.count('cache_hits', cache.hits - hits)
+        if recorder is not None:
+            recorder.record(generation_idx, fitness_array)
+        best_idx = fitness_array.index(max(fitness_array))
+        if best_fitness is None or fitness_array[best_idx] > best_fitness:
+            best_fitness = fitness_array[best_idx]
+            if controller is not None:
+                final_state, _ = simulate_final(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone,
+                                                population[best_idx])
+                landed = final_state.fly_state == FlyState.LANDED
+            yield population[best_idx], best_fitness
+
+        if controller is not None:
+            controller.update(generation_idx, fitness_array, landed)
+            if controller.stop:
+                metrics.count('early_stops')
+                return population
+
+        if deadline is None:
+            if generation_idx == GENERATION_COUNT:
+                return population
+        elif perf_counter() + generation_time > deadline:
+            return population
+
+        parent_population = population
+        if controller is None:
+            population, parents = breed(parent_population, fitness_array, rng=rng, metrics=metrics)
+        else:
+            population, parents = breed(parent_population, fitness_array, rng=rng, metrics=metrics,
+                                        size=controller.population_size, mutation_chance=controller.mutation_chance,
+                                        immigrants=controller.immigrants)
+            metrics.count('immigrants', controller.immigrants)
+        generation_time = max(generation_time, perf_counter() - started)
+
+
+def plan(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, deadline=None, population=None, cache=None,
+         evaluator=None, rng=None, metrics=NULL_METRICS, controller=None):
+    """Evolve ``population`` from the observed state for one rolling horizon turn
+
+    Returns the best chromosome, its fitness and the population to warm start
+    the next turn with (after :func:`shift_population`).
+    """
+    search = evolve(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, deadline, population, cache,
+                    evaluator, rng, metrics=metrics, controller=controller)
+    while True:
+        try:
+            best_chromosome, best_fitness = next(search)
+        except StopIteration as stop:
+            return best_chromosome, best_fitness, stop.value
+
+
+def get_best_trajectory(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, deadline=None, cache=None,
+                        evaluator=None, rng=None, metrics=NULL_METRICS):
+    if cache is None:
+        cache = FitnessCache()
+
+    for best_chromosome, best_fitness in evolve(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, deadline,
+                                                cache=cache, evaluator=evaluator, rng=rng, metrics=metrics):
+        pass
+
+    found = calculate_trajectory(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone, best_chromosome)
+
+    # imported here to keep logging (about a third more import time) out of the first turn
+    import logging
+    logging.getLogger(__name__).debug('best chromosome %s, fitness %s, last state %s, %s', best_chromosome,
+                                      best_fitness, found[-1], cache)
 
     return found
-    '''
-    return None
 
 
-def get_surface():
+def get_surface(read=input):
     surface = []
-    surface_n = int(input())
+    surface_n = int(read())
     for i in range(surface_n):
-        land_x, land_y = [int(j) for j in input().split()]
+        land_x, land_y = [int(j) for j in read().split()]
         surface.append((land_x, land_y))
     # print(surface, file=sys.stderr)
     return surface
 
 
-def calculate_landing_zone():
+def calculate_landing_zone(surface):
     landing_zone = [None] * 2
     for point1, point2 in zip(surface, surface[1:]):
         if point1[1] == point2[1]:
@@ -216,22 +806,71 @@ def calculate_landing_zone():
     return landing_zone
 
 
-if __name__ == "__main__":
+def run(read=input, write=print, store=None, instant=False):
+    """Play the game, reading the referee's lines with ``read`` and answering with ``write``
+
+    With a :class:`marslander.store.SolutionStore` the first population is
+    seeded from the genomes stored for the surface and initial state, with
+    ``instant`` the first turn is answered from the best of them without a
+    search. The fittest genomes of the first turn are stored after it is
+    answered. Returns once ``read`` raises EOFError at the end of the game.
+    """
     surface = []
     landing_zone = []
     best_trajectory = None
+    population = None
+    initial_state = None
+    cache = FitnessCache()
+    turn = 0
 
-    surface = get_surface()
-    landing_zone = calculate_landing_zone()
+    surface = get_surface(read)
+    landing_zone = Surface(surface)
 
     while True:
-        x, y, h_speed, v_speed, fuel, rotate, power = [int(i) for i in input().split()]
+        try:
+            line = read()
+        except EOFError:
+            return
+        x, y, h_speed, v_speed, fuel, rotate, power = [int(i) for i in line.split()]
+        first_turn = initial_state is None
+        if first_turn:
+            initial_state = (x, y, h_speed, v_speed, fuel, rotate, power)
+        deadline = perf_counter() + (FIRST_TURN_TIME if first_turn else TURN_TIME)
+
+        if ROLLING_HORIZON:
+            if not first_turn:
+                population = shift_population(population)
+            elif store is not None:
+                stored = store.get(SOLVER_NAME, surface, initial_state)
+                if stored:
+                    population = seed_population([genome for genome, _ in stored])
+                    if instant:
+                        write('{} {}'.format(*population[0][0]))
+                        continue
+            best_chromosome, _, population = plan(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone,
+                                                  deadline, population, cache)
+            write('{} {}'.format(*best_chromosome[0]))
+            if first_turn and store is not None:
+                fitness_array = evaluate_population(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone,
+                                                    population, cache)
+                store.put(SOLVER_NAME, surface, initial_state, zip(population, fitness_array))
+            continue
 
         if best_trajectory is None:
-            best_trajectory = get_best_trajectory(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone)
+            best_trajectory = get_best_trajectory(x, y, h_speed, v_speed, fuel, rotate, power, landing_zone,
+                                                  deadline)
 
-        if len(best_trajectory) > 0:
-            cmd = best_trajectory.pop(0)[4]
-            print('0 {}'.format(cmd))
+        turn += 1
+        if turn < len(best_trajectory):
+            cmd = best_trajectory[turn]
+            write('{} {}'.format(cmd.angle, cmd.power))
         else:
-            print("30 2")   # rotate power
+            write("30 2")   # rotate power
+
+
+if __name__ == "__main__":
+    if os.environ.get('MARSLANDER_STORE'):
+        from marslander.store import SolutionStore
+        run(store=SolutionStore(os.environ['MARSLANDER_STORE']))
+    else:
+        run()
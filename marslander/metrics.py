@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Instrumentation of the solvers without printing in the hot loop.
+
+The solvers report to a metrics sink passed as ``metrics``:
+
+- ``sink.timer(name)`` is a context manager adding the elapsed time of its
+  block to the phase ``name`` (``simulate``, ``select``, ``breed``),
+- ``sink.count(name, value)`` adds to the counter ``name`` (``generations``,
+  ``evaluations``, ``cache_hits``, ``early_terminations``, ...).
+
+``NULL_METRICS`` is the default, its timer and counters do nothing, so
+disabled instrumentation costs one method call per phase and generation.
+:class:`Metrics` collects the totals and :func:`capture` additionally
+records a cProfile profile and tracemalloc allocation statistics of a
+block.
+"""
+from __future__ import division, print_function, absolute_import
+
+import sys
+import contextlib
+from time import perf_counter
+from collections import defaultdict
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+class _NullTimer(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _Timer(object):
+    __slots__ = ('metrics', 'name', 'started')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.add_time(self.name, perf_counter() - self.started)
+        return False
+
+
+class NullMetrics(object):
+    """Sink discarding everything"""
+
+    enabled = False
+    _timer = _NullTimer()
+
+    def timer(self, name):
+        return self._timer
+
+    def count(self, name, value=1):
+        pass
+
+    def snapshot(self):
+        return {'timers': {}, 'counters': {}}
+
+
+NULL_METRICS = NullMetrics()
+
+
+class Metrics(object):
+    """Sink summing phase times and counters"""
+
+    enabled = True
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+
+    def timer(self, name):
+        """Context manager timing its block as phase ``name``"""
+        return _Timer(self, name)
+
+    def add_time(self, name, seconds):
+        """Add ``seconds`` spent in one call of phase ``name``"""
+        self.seconds[name] += seconds
+        self.calls[name] += 1
+
+    def count(self, name, value=1):
+        """Add ``value`` to the counter ``name``"""
+        self.counters[name] += value
+
+    def snapshot(self):
+        """dict: ``timers`` (phase -> seconds, calls) and ``counters``"""
+        return {'timers': {name: {'seconds': seconds, 'calls': self.calls[name]}
+                           for name, seconds in self.seconds.items()},
+                'counters': dict(self.counters)}
+
+    def report(self, file=sys.stderr):
+        """Print the phase times and counters to ``file``"""
+        for name, seconds in sorted(self.seconds.items(), key=lambda item: -item[1]):
+            print('{:<16} {:>10.4f} s {:>8d} calls'.format(name, seconds, self.calls[name]), file=file)
+        for name, value in sorted(self.counters.items()):
+            print('{:<16} {:>10}'.format(name, value), file=file)
+
+    def clear(self):
+        """Reset all timers and counters"""
+        self.seconds.clear()
+        self.calls.clear()
+        self.counters.clear()
+
+    def __repr__(self):
+        return 'Metrics(timers={}, counters={})'.format(dict(self.seconds), dict(self.counters))
+
+
+class Capture(object):
+    """Result of :func:`capture`
+
+    Attributes:
+      profile (cProfile.Profile): the profile, None if not profiled
+      memory (list): the largest allocations by line as
+        ``tracemalloc.Statistic``, None if not traced
+      peak (int): peak traced memory in bytes, None if not traced
+    """
+
+    def __init__(self):
+        self.profile = None
+        self.memory = None
+        self.peak = None
+
+    def report(self, file=sys.stderr, limit=20, sort='cumulative'):
+        """Print the top ``limit`` profile entries and allocations to ``file``"""
+        if self.profile is not None:
+            import pstats
+            pstats.Stats(self.profile, stream=file).sort_stats(sort).print_stats(limit)
+        if self.memory is not None:
+            print('peak traced memory: {} bytes'.format(self.peak), file=file)
+            for statistic in self.memory[:limit]:
+                print(statistic, file=file)
+
+
+@contextlib.contextmanager
+def capture(profile=True, memory=False, frames=1):
+    """Profile and/or trace the allocations of the ``with`` block
+
+    Args:
+      profile (bool): record a cProfile profile
+      memory (bool): trace allocations with tracemalloc
+      frames (int): traceback frames tracemalloc keeps per allocation
+
+    Yields:
+      Capture: filled in when the block exits
+    """
+    import cProfile
+    import tracemalloc
+
+    result = Capture()
+    profiler = cProfile.Profile() if profile else None
+    if memory:
+        tracemalloc.start(frames)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield result
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            result.profile = profiler
+        if memory:
+            result.memory = tracemalloc.take_snapshot().statistics('lineno')
+            result.peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Batched genetic operators shared by the marslander solvers.
+
+A population is a (population, genes, ...) NumPy array, so a whole
+generation is crossed and mutated with a handful of array operations
+driven by a ``numpy.random.Generator``:
+
+- crossover draws ``points`` cut positions per pair and swaps every other
+  run of genes between the two parents,
+- mutation replaces each gene field with a fresh random value with the
+  given chance,
+- elites are copied to the first slots untouched.
+"""
+from __future__ import division, print_function, absolute_import
+
+import numpy as np
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def crossover_mask(rng, count, genes, points=1):
+    """Genes taken from the second parent
+
+    Args:
+      rng (numpy.random.Generator): random generator
+      count (int): number of pairs
+      genes (int): genes per chromosome
+      points (int): cut points per pair
+
+    Returns:
+      numpy.ndarray: (count, genes) boolean mask, True from every odd cut on
+    """
+    cuts = rng.integers(0, genes, size=(count, points))
+    crossed = (np.arange(genes)[None, :, None] >= cuts[:, None, :]).sum(axis=2)
+    return crossed % 2 == 1
+
+
+def crossover(rng, parents1, parents2, points=1):
+    """Cross every pair of ``parents1`` and ``parents2`` rows
+
+    Returns:
+      tuple: children starting like ``parents1`` and like ``parents2``
+    """
+    mask = crossover_mask(rng, len(parents1), parents1.shape[1], points)
+    mask = mask.reshape(mask.shape + (1,) * (parents1.ndim - 2))
+    return np.where(mask, parents2, parents1), np.where(mask, parents1, parents2)
+
+
+def mutate(rng, population, chance, random_genomes):
+    """Replace each gene field of ``population`` with probability ``chance``
+
+    Args:
+      rng (numpy.random.Generator): random generator
+      population (numpy.ndarray): chromosomes to mutate
+      chance (float): mutation chance of a single gene field
+      random_genomes: ``random_genomes(rng, count)`` returning ``count``
+        random chromosomes shaped like the population rows
+
+    Returns:
+      numpy.ndarray: mutated copy of ``population``
+    """
+    mask = rng.random(population.shape) < chance
+    if not mask.any():
+        return population.copy()
+    return np.where(mask, random_genomes(rng, len(population)), population)
+
+
+def next_generation(rng, population, elites, parents1, parents2, chance, random_genomes, points=1):
+    """Elites followed by mutated children of the (parents1, parents2) pairs
+
+    Args:
+      rng (numpy.random.Generator): random generator
+      population (numpy.ndarray): current generation
+      elites: indices of chromosomes copied unchanged
+      parents1, parents2: indices of the parents of every pair
+      chance (float): mutation chance of a single gene field
+      random_genomes: see :func:`mutate`
+      points (int): crossover cut points per pair
+
+    Returns:
+      tuple: the children and for every child the index of the parent it
+      shares its leading genes with
+    """
+    elites = np.asarray(elites, dtype=int)
+    parents1 = np.asarray(parents1, dtype=int)
+    parents2 = np.asarray(parents2, dtype=int)
+
+    children1, children2 = crossover(rng, population[parents1], population[parents2], points)
+    offspring = np.stack((children1, children2), axis=1).reshape((-1,) + population.shape[1:])
+    offspring = mutate(rng, offspring, chance, random_genomes)
+    offspring_parents = np.stack((parents1, parents2), axis=1).reshape(-1)
+
+    return (np.concatenate((population[elites], offspring)),
+            np.concatenate((elites, offspring_parents)))
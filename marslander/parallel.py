@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Parallel fitness evaluation on a persistent pool of worker processes.
+
+Every worker keeps the current scenario (the leading arguments of the
+solver's ``evaluate_population``), so a scenario is shipped to each worker
+once and a generation only sends the chromosomes. The population is split
+into contiguous chunks, one per worker, and the results are joined back in
+order, which keeps evaluation deterministic.
+"""
+from __future__ import division, print_function, absolute_import
+
+import os
+import multiprocessing
+
+import numpy as np
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def available_cpus():
+    """Number of cores this process may run on
+
+    Returns:
+      int: size of the CPU affinity set, or the CPU count where unsupported
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _serve(evaluate, connection):
+    scenario = ()
+    while True:
+        command, payload = connection.recv()
+        if command == 'scenario':
+            scenario = payload
+        elif command == 'evaluate':
+            try:
+                connection.send((True, evaluate(*scenario, payload)))
+            except Exception as error:
+                connection.send((False, error))
+        else:
+            break
+    connection.close()
+
+
+class ParallelEvaluator(object):
+    """Callable evaluating a population across worker processes
+
+    Args:
+      evaluate: module level function called as
+        ``evaluate(*scenario, population)`` in the workers
+      scenario (tuple): initial scenario, see :meth:`set_scenario`
+      workers (int): number of processes, defaults to the available cores
+    """
+
+    def __init__(self, evaluate, scenario=None, workers=None):
+        self.workers = workers or available_cpus()
+        self._connections = []
+        self._processes = []
+        for _ in range(self.workers):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_serve, args=(evaluate, worker_connection), daemon=True)
+            process.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+        if scenario is not None:
+            self.set_scenario(scenario)
+
+    def set_scenario(self, scenario):
+        """Ship the leading ``evaluate`` arguments to every worker
+
+        Args:
+          scenario (tuple): arguments preceding the population
+        """
+        for connection in self._connections:
+            connection.send(('scenario', tuple(scenario)))
+
+    def __call__(self, population):
+        """Evaluate ``population``, a list or an array of chromosomes
+
+        Returns:
+          fitness values in population order, an array if the workers
+          returned arrays and a list otherwise. An empty population is not
+          sent to the workers, it gives an empty array if it is an array.
+        """
+        count = len(population)
+        if count == 0:
+            return np.empty(0) if isinstance(population, np.ndarray) else []
+        chunks = min(self.workers, count)
+        bounds = [count * idx // chunks for idx in range(chunks + 1)]
+        for connection, start, end in zip(self._connections, bounds, bounds[1:]):
+            connection.send(('evaluate', population[start:end]))
+
+        replies = [connection.recv() for connection in self._connections[:chunks]]
+        for ok, result in replies:
+            if not ok:
+                raise result
+        parts = [result for _, result in replies]
+
+        if parts and isinstance(parts[0], np.ndarray):
+            return np.concatenate(parts)
+        return [fitness_value for part in parts for fitness_value in part]
+
+    def close(self):
+        """Stop the workers"""
+        for connection in self._connections:
+            connection.send(('close', None))
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
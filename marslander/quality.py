@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Solution quality per unit of time on the canned scenarios.
+
+Every run evolves one plan from a scenario's initial state within a time
+budget (one second, the first turn of the game, by default) with its own
+seeded random stream. A run reports when the best chromosome first became a safe landing
+and how much fuel the best chromosome has left at the deadline, and the
+percentiles of both are summarized over all seeds:
+
+    python -m marslander.quality --seeds 20 -o quality.json
+
+With ``--convergence DIR`` the per generation convergence of every run is
+written there as ``<solver>-<scenario>-<seed>.csv``.
+"""
+from __future__ import division, print_function, absolute_import
+
+import os
+import sys
+import json
+import logging
+import argparse
+import importlib
+from time import perf_counter
+
+from marslander import __version__
+from marslander import scenarios
+from marslander.benchmark import SOLVERS, environment
+from marslander.cache import FitnessCache
+from marslander.convergence import ConvergenceRecorder
+from marslander.rng import SolverRandom
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+_logger = logging.getLogger(__name__)
+
+PERCENTILES = (10, 50, 90)
+
+
+def _marslander1_outcome(solver, arguments, chromosome):
+    state, _ = solver.simulate_final(*arguments, chromosome)
+    return state[5] == solver.FlyState.LANDED, state[3]
+
+
+def _marslander2_outcome(solver, arguments, chromosome):
+    state, _ = solver.simulate_final(*arguments, chromosome)
+    return state.fly_state == solver.FlyState.LANDED, state.fuel
+
+
+OUTCOMES = {
+    'marslander1': _marslander1_outcome,
+    'marslander2': _marslander2_outcome,
+}
+
+
+def percentile(values, q):
+    """``q``-th percentile of ``values`` interpolating between the closest ranks
+
+    Returns:
+      float: the percentile or None for no values
+    """
+    values = sorted(values)
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def run_once(solver_name, scenario_name, rng, budget, recorder=None):
+    """Evolve one plan and report its quality
+
+    Args:
+      solver_name (str): name from ``SOLVERS``
+      scenario_name (str): name from :data:`marslander.scenarios.SCENARIOS`
+      rng (SolverRandom): random stream of the run
+      budget (float): seconds until the deadline
+      recorder (ConvergenceRecorder): convergence of the run
+
+    Returns:
+      dict: landed, seconds to the first safe landing (None without one),
+      fuel left by the best plan (None unless it lands), best fitness and
+      the number of improvements
+    """
+    module_name, to_arguments = SOLVERS[solver_name]
+    solver = importlib.import_module(module_name)
+    outcome = OUTCOMES[solver_name]
+    arguments = to_arguments(scenarios.SCENARIOS[scenario_name])
+
+    started = perf_counter()
+    time_to_landing = best_chromosome = best_fitness = None
+    improvements = 0
+    for best_chromosome, best_fitness in solver.evolve(*arguments, deadline=started + budget, cache=FitnessCache(),
+                                                       rng=rng, recorder=recorder):
+        improvements += 1
+        if time_to_landing is None and outcome(solver, arguments, best_chromosome)[0]:
+            time_to_landing = perf_counter() - started
+
+    landed, fuel = outcome(solver, arguments, best_chromosome)
+    return {'landed': bool(landed), 'time_to_landing': time_to_landing, 'fuel': float(fuel) if landed else None,
+            'fitness': float(best_fitness), 'improvements': improvements}
+
+
+def summarize(runs):
+    """Landing rate and percentiles of the ``runs`` of :func:`run_once`"""
+    times = [run['time_to_landing'] for run in runs if run['time_to_landing'] is not None]
+    fuel = [run['fuel'] for run in runs if run['fuel'] is not None]
+    return {
+        'count': len(runs),
+        'landed': sum(run['landed'] for run in runs),
+        'landing_rate': sum(run['landed'] for run in runs) / len(runs) if runs else 0.,
+        'time_to_landing': {'p{}'.format(q): percentile(times, q) for q in PERCENTILES},
+        'fuel': {'p{}'.format(q): percentile(fuel, q) for q in PERCENTILES},
+    }
+
+
+def run_quality(solvers=None, scenario_names=None, seeds=10, budget=1., seed=0, convergence=None):
+    """Run ``seeds`` runs of every solver on every scenario
+
+    Args:
+      solvers: names from ``SOLVERS``, all by default
+      scenario_names: scenario names, all by default
+      seeds (int): runs per solver and scenario
+      budget (float): seconds every run may take
+      seed (int): seed the run streams are spawned from
+      convergence (str): directory to write the convergence CSV files to
+
+    Returns:
+      list: one dict per (solver, scenario) with the summary and the runs
+    """
+    results = []
+    for solver_name in solvers or sorted(SOLVERS):
+        for scenario_name in scenario_names or sorted(scenarios.SCENARIOS):
+            runs = []
+            for run_idx, rng in enumerate(SolverRandom(seed).spawn(seeds)):
+                recorder = ConvergenceRecorder() if convergence else None
+                run = run_once(solver_name, scenario_name, rng, budget, recorder)
+                if recorder is not None:
+                    recorder.write_csv(os.path.join(
+                        convergence, '{}-{}-{}.csv'.format(solver_name, scenario_name, run_idx)))
+                runs.append(run)
+            summary = summarize(runs)
+            _logger.info('%s %s: %d/%d landed', solver_name, scenario_name, summary['landed'], summary['count'])
+            results.append(dict(summary, solver=solver_name, scenario=scenario_name, runs=runs))
+    return results
+
+
+def parse_args(args):
+    """Parse command line parameters
+
+    Args:
+      args ([str]): command line parameters as list of strings
+
+    Returns:
+      :obj:`argparse.Namespace`: command line parameters namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the solution quality of the marslander solvers")
+    parser.add_argument(
+        '--version',
+        action='version',
+        version='marslander {ver}'.format(ver=__version__))
+    parser.add_argument(
+        '--solver',
+        dest="solvers",
+        help="solver to run, repeatable (default: all)",
+        action='append',
+        choices=sorted(SOLVERS))
+    parser.add_argument(
+        '--scenario',
+        dest="scenarios",
+        help="scenario to run, repeatable (default: all)",
+        action='append',
+        choices=sorted(scenarios.SCENARIOS))
+    parser.add_argument(
+        '-n',
+        '--seeds',
+        help="runs per solver and scenario (default: %(default)s)",
+        type=int,
+        default=10)
+    parser.add_argument(
+        '-b',
+        '--budget',
+        help="seconds per run (default: %(default)s)",
+        type=float,
+        default=1.)
+    parser.add_argument(
+        '--seed',
+        help="seed the runs are spawned from (default: %(default)s)",
+        type=int,
+        default=0)
+    parser.add_argument(
+        '-o',
+        '--output',
+        help="JSON file to write the results to",
+        metavar="FILE")
+    parser.add_argument(
+        '--convergence',
+        help="directory to write per run convergence CSV files to",
+        metavar="DIR")
+    parser.add_argument(
+        '-v',
+        '--verbose',
+        dest="loglevel",
+        help="set loglevel to INFO",
+        action='store_const',
+        const=logging.INFO)
+    parser.add_argument(
+        '-vv',
+        '--very-verbose',
+        dest="loglevel",
+        help="set loglevel to DEBUG",
+        action='store_const',
+        const=logging.DEBUG)
+    return parser.parse_args(args)
+
+
+def setup_logging(loglevel):
+    """Setup basic logging
+
+    Args:
+      loglevel (int): minimum loglevel for emitting messages
+    """
+    logformat = "[%(asctime)s] %(levelname)s:%(name)s:%(message)s"
+    logging.basicConfig(level=loglevel, stream=sys.stdout,
+                        format=logformat, datefmt="%Y-%m-%d %H:%M:%S")
+
+
+def main(args):
+    """Main entry point allowing external calls
+
+    Args:
+      args ([str]): command line parameter list
+    """
+    args = parse_args(args)
+    setup_logging(args.loglevel)
+    if args.convergence and not os.path.isdir(args.convergence):
+        os.makedirs(args.convergence)
+    results = run_quality(args.solvers, args.scenarios, args.seeds, args.budget, args.seed, args.convergence)
+
+    if args.output:
+        report = {'environment': environment(), 'budget': args.budget, 'seed': args.seed, 'results': results}
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+    def format_value(value, pattern):
+        return pattern.format(value) if value is not None else '-'
+
+    for result in results:
+        print('{:<12} {:<12} landed {:>3d}/{:<3d} time {} fuel {}'.format(
+            result['solver'], result['scenario'], result['landed'], result['count'],
+            '/'.join(format_value(value, '{:.3f}') for value in result['time_to_landing'].values()),
+            '/'.join(format_value(value, '{:.0f}') for value in result['fuel'].values())))
+
+
+def run():
+    """Entry point for console_scripts
+    """
+    main(sys.argv[1:])
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Offline Mars Lander referee.
+
+The referee plays a scenario against a solver the way the online game
+does. It sends the surface once, then every turn it sends the lander state
+and reads back a ``rotation power`` command. The command is applied with the
+rules of the game: rotation changes by at most 15 degrees and power by at
+most 1 per turn, power is limited by the fuel left, and the physics are
+those of :func:`marslander.marslander2.solution.step`. The game ends when
+the lander lands, crashes or leaves the zone.
+
+A solver is played in-process (:class:`InProcessPlayer`, its ``run(read,
+write)`` in a thread) or over pipes (:class:`SubprocessPlayer`, any command
+line). The referee measures the response latency of every turn and flags
+the turns answered after the deadline: 1 s for the first turn and 100 ms for
+every other. The whole game is recorded and can be saved, loaded and replayed
+to check that the same commands still give the same states:
+
+    python -m marslander.referee cave --solver marslander2 --save cave.json
+    python -m marslander.referee --replay cave.json
+"""
+from __future__ import division, print_function, absolute_import
+
+import os
+import sys
+import json
+import queue
+import shlex
+import logging
+import argparse
+import threading
+import importlib
+import subprocess
+from time import perf_counter
+
+from marslander import __version__
+from marslander import scenarios
+from marslander.marslander2.solution import (ROTATION_MIN, ROTATION_MAX, POWER_MIN, POWER_MAX, FlyState, State,
+                                             Surface, step)
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+_logger = logging.getLogger(__name__)
+
+FIRST_TURN_TIME = 1.    # seconds the game allows for the first answer
+TURN_TIME = 0.1         # and for every other one
+HARD_TIMEOUT = 5.       # seconds after which a silent player forfeits
+MAX_TURNS = 1000
+
+SOLVERS = {
+    'marslander1': 'marslander.marslander1.solution',
+    'marslander2': 'marslander.marslander2.solution',
+}
+
+_END = object()
+
+
+class InProcessPlayer(object):
+    """Solver module playing in a thread of this process
+
+    Args:
+      solver: module with a ``run(read, write)`` turn loop
+    """
+
+    def __init__(self, solver):
+        self.name = solver.__name__
+        self._inputs = queue.Queue()
+        self._outputs = queue.Queue()
+        self._thread = threading.Thread(target=self._play, args=(solver,), daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        line = self._inputs.get()
+        if line is _END:
+            raise EOFError
+        return line
+
+    def _play(self, solver):
+        try:
+            solver.run(self._read, self._outputs.put)
+        except Exception as error:
+            _logger.exception('%s failed', self.name)
+            self._outputs.put(error)
+
+    def send(self, lines):
+        """Queue ``lines`` for the solver's ``read``"""
+        for line in lines:
+            self._inputs.put(line)
+
+    def receive(self, timeout):
+        """Next line written by the solver, None after ``timeout`` seconds"""
+        try:
+            line = self._outputs.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return None if isinstance(line, Exception) else line
+
+    def close(self):
+        """End the game, the solver's ``read`` raises EOFError"""
+        self._inputs.put(_END)
+        self._thread.join(HARD_TIMEOUT)
+
+
+class SubprocessPlayer(object):
+    """Solver command line playing over its stdin and stdout
+
+    Args:
+      command (list): program and arguments, e.g.
+        ``[sys.executable, '-m', 'marslander.marslander2.solution']``
+    """
+
+    def __init__(self, command):
+        self.name = ' '.join(command)
+        environment = dict(os.environ, PYTHONUNBUFFERED='1')
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=environment,
+                                         universal_newlines=True, bufsize=1)
+        self._outputs = queue.Queue()
+        self._reader = threading.Thread(target=self._pump, daemon=True)
+        self._reader.start()
+
+    def _pump(self):
+        for line in self._process.stdout:
+            self._outputs.put(line.rstrip('\n'))
+        self._outputs.put(None)
+
+    def send(self, lines):
+        """Write ``lines`` to the solver's stdin"""
+        try:
+            self._process.stdin.write(''.join(line + '\n' for line in lines))
+            self._process.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            pass
+
+    def receive(self, timeout):
+        """Next line printed by the solver, None after ``timeout`` seconds or at its exit"""
+        try:
+            return self._outputs.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Close the solver's stdin and wait for it to exit"""
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        try:
+            self._process.wait(HARD_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+
+def parse_command(line):
+    """(rotation, power) of a command line, None unless it is valid"""
+    try:
+        rotation, power = [int(value) for value in line.split()[:2]]
+    except (AttributeError, ValueError):
+        return None
+    if not (ROTATION_MIN <= rotation <= ROTATION_MAX and POWER_MIN <= power <= POWER_MAX):
+        return None
+    return rotation, power
+
+
+def play(scenario, player, first_turn_time=FIRST_TURN_TIME, turn_time=TURN_TIME, strict=False,
+         hard_timeout=HARD_TIMEOUT, max_turns=MAX_TURNS):
+    """Play ``scenario`` against ``player``
+
+    Args:
+      scenario (Scenario): surface and initial state
+      player: :class:`InProcessPlayer` or :class:`SubprocessPlayer`, closed
+        when the game is over
+      first_turn_time (float): deadline of the first answer in seconds
+      turn_time (float): deadline of every other answer in seconds
+      strict (bool): a missed deadline loses the game as it does online,
+        otherwise it is only recorded
+      hard_timeout (float): seconds after which a silent player loses
+      max_turns (int): turns after which a hovering lander loses
+
+    Returns:
+      dict: the game record, see :func:`replay`
+    """
+    surface = Surface(scenario.surface)
+    state = State(*scenario.state, fly_state=FlyState.FLYING)
+    turns = []
+    outcome = None
+    try:
+        player.send([str(len(scenario.surface))] + ['{} {}'.format(x, y) for x, y in scenario.surface])
+        while outcome is None:
+            limit = first_turn_time if not turns else turn_time
+            reported = state.reported()
+            sent = perf_counter()
+            player.send([' '.join(str(value) for value in reported)])
+            line = player.receive(max(hard_timeout, limit))
+            latency = perf_counter() - sent
+            missed = latency > limit
+            turns.append({'state': list(reported), 'command': line, 'latency': latency, 'missed': missed})
+
+            command = parse_command(line)
+            if line is None:
+                outcome = 'TIMEOUT'
+            elif command is None:
+                outcome = 'INVALID'
+            elif missed and strict:
+                outcome = 'TIMEOUT'
+            else:
+                step(state, command[0], command[1], surface)
+                if state.fly_state != FlyState.FLYING:
+                    outcome = state.fly_state.name
+                elif len(turns) >= max_turns:
+                    outcome = 'LOST'
+    finally:
+        player.close()
+
+    latencies = sorted(turn['latency'] for turn in turns)
+    return {
+        'scenario': scenario.name,
+        'surface': [list(point) for point in scenario.surface],
+        'state': list(scenario.state),
+        'player': player.name,
+        'first_turn_time': first_turn_time,
+        'turn_time': turn_time,
+        'outcome': outcome,
+        'final_state': list(state.reported()),
+        'turns': turns,
+        'missed_deadlines': sum(turn['missed'] for turn in turns),
+        'max_latency': latencies[-1] if latencies else None,
+        'median_latency': latencies[len(latencies) // 2] if latencies else None,
+    }
+
+
+def replay(record):
+    """Apply the commands of a game ``record`` again
+
+    Returns:
+      tuple: the outcome and the turns whose sent state differs from the
+      recorded one, empty when the game replays identically
+    """
+    surface = Surface(record['surface'])
+    state = State(*record['state'], fly_state=FlyState.FLYING)
+    mismatches = []
+    for turn_idx, turn in enumerate(record['turns']):
+        if list(state.reported()) != turn['state']:
+            mismatches.append(turn_idx)
+        command = parse_command(turn['command'])
+        if command is None:
+            break
+        step(state, command[0], command[1], surface)
+        if state.fly_state != FlyState.FLYING:
+            return state.fly_state.name, mismatches
+    return record['outcome'], mismatches
+
+
+def save_game(record, path):
+    """Write the game ``record`` to the JSON file ``path``"""
+    with open(path, 'w') as output:
+        json.dump(record, output, indent=1)
+
+
+def load_game(path):
+    """Game record saved by :func:`save_game`"""
+    with open(path) as game:
+        return json.load(game)
+
+
+def load_scenario(name_or_path):
+    """Canned scenario by name, or a file in the game's input format
+
+    The file holds the number of surface points, one ``x y`` line per point
+    and the line of the initial state.
+    """
+    if name_or_path in scenarios.SCENARIOS:
+        return scenarios.SCENARIOS[name_or_path]
+    with open(name_or_path) as scenario_file:
+        lines = [line for line in scenario_file.read().splitlines() if line.strip()]
+    count = int(lines[0])
+    surface = tuple(tuple(int(value) for value in line.split()) for line in lines[1:count + 1])
+    state = tuple(int(value) for value in lines[count + 1].split())
+    return scenarios.Scenario(os.path.splitext(os.path.basename(name_or_path))[0], surface, state)
+
+
+def parse_args(args):
+    """Parse command line parameters
+
+    Args:
+      args ([str]): command line parameters as list of strings
+
+    Returns:
+      :obj:`argparse.Namespace`: command line parameters namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Play Mars Lander games against a solver offline")
+    parser.add_argument(
+        '--version',
+        action='version',
+        version='marslander {ver}'.format(ver=__version__))
+    parser.add_argument(
+        dest="scenario",
+        help="canned scenario name or surface file ({})".format(', '.join(sorted(scenarios.SCENARIOS))),
+        nargs='?')
+    parser.add_argument(
+        '--solver',
+        help="solver played in-process (default: %(default)s)",
+        choices=sorted(SOLVERS),
+        default='marslander2')
+    parser.add_argument(
+        '--command',
+        help="command line of a solver played over pipes instead")
+    parser.add_argument(
+        '--strict',
+        help="lose the game on a missed deadline",
+        action='store_true')
+    parser.add_argument(
+        '--save',
+        help="JSON file to save the game to",
+        metavar="FILE")
+    parser.add_argument(
+        '--replay',
+        help="replay a saved game instead of playing",
+        metavar="FILE")
+    parser.add_argument(
+        '-v',
+        '--verbose',
+        dest="loglevel",
+        help="set loglevel to INFO",
+        action='store_const',
+        const=logging.INFO)
+    parser.add_argument(
+        '-vv',
+        '--very-verbose',
+        dest="loglevel",
+        help="set loglevel to DEBUG",
+        action='store_const',
+        const=logging.DEBUG)
+    return parser.parse_args(args)
+
+
+def setup_logging(loglevel):
+    """Setup basic logging
+
+    Args:
+      loglevel (int): minimum loglevel for emitting messages
+    """
+    logformat = "[%(asctime)s] %(levelname)s:%(name)s:%(message)s"
+    logging.basicConfig(level=loglevel, stream=sys.stdout,
+                        format=logformat, datefmt="%Y-%m-%d %H:%M:%S")
+
+
+def main(args):
+    """Main entry point allowing external calls
+
+    Args:
+      args ([str]): command line parameter list
+
+    Returns:
+      int: 0 when the game is landed (or replays identically)
+    """
+    args = parse_args(args)
+    setup_logging(args.loglevel)
+
+    if args.replay:
+        record = load_game(args.replay)
+        outcome, mismatches = replay(record)
+        print('{}: {} (recorded {}), {} mismatching turns'.format(
+            args.replay, outcome, record['outcome'], len(mismatches)))
+        return 0 if outcome == record['outcome'] and not mismatches else 1
+
+    if args.scenario is None:
+        raise SystemExit('a scenario is required unless --replay is given')
+    scenario = load_scenario(args.scenario)
+    if args.command:
+        player = SubprocessPlayer(shlex.split(args.command))
+    else:
+        player = InProcessPlayer(importlib.import_module(SOLVERS[args.solver]))
+    record = play(scenario, player, strict=args.strict)
+    if args.save:
+        save_game(record, args.save)
+
+    print('{} {}: {} after {} turns, fuel {}, {} missed deadlines, latency median {:.4f} s max {:.4f} s'.format(
+        record['scenario'], record['player'], record['outcome'], len(record['turns']), record['final_state'][4],
+        record['missed_deadlines'], record['median_latency'] or 0., record['max_latency'] or 0.))
+    return 0 if record['outcome'] == FlyState.LANDED.name else 1
+
+
+def run():
+    """Entry point for console_scripts
+    """
+    sys.exit(main(sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    run()
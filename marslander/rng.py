@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Reproducible random streams for the marslander solvers.
+
+A :class:`SolverRandom` is a :class:`random.Random` derived from one seed and
+a spawn key, the path of :meth:`SolverRandom.spawn` calls that produced it.
+Streams spawned from the same seed never overlap, so every worker or island
+gets its own stream and a whole run is replayed from a single seed whatever
+the number of processes. The matching ``numpy.random.Generator`` for
+batched draws is created on first use, keeping NumPy out of the import path
+of solvers that never breed in batches.
+"""
+from __future__ import division, print_function, absolute_import
+
+import random
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+_default = None
+
+
+class SolverRandom(random.Random):
+    """Seeded random stream that can be split into independent streams
+
+    Args:
+      seed (int): entropy of the stream family, a fresh one when omitted
+      spawn_key (tuple): path of the stream within its family
+    """
+
+    def __init__(self, seed=None, spawn_key=()):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(128)
+        self.entropy = int(seed)
+        self.spawn_key = tuple(spawn_key)
+        self._spawned = 0
+        self._generator = None
+        # a str seed is hashed with SHA-512 by random.Random itself
+        super(SolverRandom, self).__init__(repr((self.entropy, self.spawn_key)))
+
+    @property
+    def generator(self):
+        """numpy.random.Generator: batched stream of the same seed and key"""
+        if self._generator is None:
+            import numpy as np
+            sequence = np.random.SeedSequence(self.entropy, spawn_key=self.spawn_key)
+            self._generator = np.random.Generator(np.random.PCG64(sequence))
+        return self._generator
+
+    @property
+    def state(self):
+        """tuple: (seed, spawn key) to recreate this stream, e.g. in a worker"""
+        return self.entropy, self.spawn_key
+
+    def spawn(self, count):
+        """Split off ``count`` independent child streams
+
+        Consecutive calls keep numbering the children, so no two children of
+        a stream are ever equal.
+
+        Returns:
+          list: :class:`SolverRandom` children
+        """
+        children = [SolverRandom(self.entropy, self.spawn_key + (self._spawned + idx,)) for idx in range(count)]
+        self._spawned += count
+        return children
+
+    def __reduce__(self):
+        return SolverRandom, self.state, self.getstate()
+
+    def __repr__(self):
+        return 'SolverRandom(seed={}, spawn_key={})'.format(self.entropy, self.spawn_key)
+
+
+def default_random():
+    """Process wide stream used where no ``rng`` is passed"""
+    global _default
+    if _default is None:
+        _default = SolverRandom()
+    return _default
+
+
+def seed(value=None):
+    """Reseed the process wide stream
+
+    Args:
+      value (int): seed, a fresh one when omitted
+
+    Returns:
+      SolverRandom: the new default stream
+    """
+    global _default
+    _default = SolverRandom(value)
+    return _default
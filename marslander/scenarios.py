@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Canned Mars Lander scenarios for benchmarks and regression runs.
+
+A scenario is a surface, given as the (x, y) points of the game input, and
+the initial lander state ``(x, y, h_speed, v_speed, fuel, rotate, power)``.
+:func:`marslander1_arguments` and :func:`marslander2_arguments` turn it into
+the leading arguments of the respective solver's simulation functions.
+"""
+from __future__ import division, print_function, absolute_import
+
+from collections import namedtuple
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+Scenario = namedtuple('Scenario', 'name surface state')
+
+SCENARIOS = {scenario.name: scenario for scenario in (
+    Scenario('flat',
+             ((0, 100), (1000, 500), (1500, 100), (3000, 100), (5000, 1500), (6999, 1000)),
+             (2500, 2500, 0, 0, 500, 0, 0)),
+    Scenario('straight',
+             ((0, 100), (1000, 500), (1500, 1500), (3000, 1000), (4000, 150), (5500, 150), (6999, 800)),
+             (2500, 2700, 0, 0, 550, 0, 0)),
+    Scenario('high_speed',
+             ((0, 100), (1000, 500), (1500, 1500), (3000, 1000), (4000, 150), (5500, 150), (6999, 800)),
+             (6500, 2800, -90, 0, 750, 90, 0)),
+    Scenario('cave',
+             ((0, 1000), (300, 1500), (350, 1400), (500, 2000), (800, 1800), (1000, 2500), (1200, 2100),
+              (1500, 2400), (2000, 1000), (2200, 500), (2500, 100), (2900, 800), (3000, 500), (3200, 1000),
+              (3500, 2000), (3800, 800), (4000, 200), (5000, 200), (5500, 1500), (6999, 2800)),
+             (500, 2700, 100, 0, 800, -90, 0)),
+    Scenario('high_ground',
+             ((0, 1000), (300, 1500), (350, 1400), (500, 2100), (1500, 2100), (2000, 200), (2500, 500),
+              (2900, 300), (3000, 200), (3200, 1000), (3500, 500), (3800, 800), (4000, 200), (4200, 800),
+              (4800, 600), (5000, 1200), (5500, 900), (6000, 500), (6500, 300), (6999, 500)),
+             (6500, 2700, -50, 0, 1000, 90, 0)),
+)}
+
+
+def landing_height(surface):
+    """Height of the last flat segment of ``surface``, 0 without one"""
+    height = 0
+    for (_, y1), (_, y2) in zip(surface, surface[1:]):
+        if y1 == y2:
+            height = y1
+    return height
+
+
+def marslander1_arguments(scenario):
+    """(landing_height, position, speed, fuel, power) of a vertical landing"""
+    x, y, h_speed, v_speed, fuel, rotate, power = scenario.state
+    return landing_height(scenario.surface), y, v_speed, fuel, power
+
+
+def marslander2_arguments(scenario):
+    """(x, y, h_speed, v_speed, fuel, rotate, power, surface) of a full landing"""
+    from marslander.marslander2.solution import Surface
+
+    return tuple(scenario.state) + (Surface(scenario.surface),)
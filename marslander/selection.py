@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Parent selection operators shared by the marslander solvers.
+
+Every operator takes the fitness values of a population and returns the
+indices of ``count`` selected chromosomes. The cumulative weights are built
+once per call and each draw is a binary search, so selecting a whole
+generation is O(n log n) instead of the O(n^2) of re-summing the weights for
+every draw.
+"""
+from __future__ import division, print_function, absolute_import
+
+import heapq
+from bisect import bisect_right
+from itertools import accumulate
+
+from marslander.rng import default_random
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def _weighted(weights, count, rng):
+    rng = rng or default_random()
+    cumulative = list(accumulate(max(weight, 0) for weight in weights))
+    total = cumulative[-1]
+    if total <= 0:
+        return [rng.randrange(len(cumulative)) for _ in range(count)]
+    last = len(cumulative) - 1
+    return [min(bisect_right(cumulative, rng.uniform(0, total)), last) for _ in range(count)]
+
+
+def roulette(fitness, count, rng=None):
+    """Fitness proportionate selection, negative fitness counts as zero
+
+    Args:
+      fitness: fitness values of the population
+      count (int): number of indices to draw
+      rng: source of randomness with ``uniform`` and ``randrange``,
+        defaults to :func:`marslander.rng.default_random`
+
+    Returns:
+      list: selected indices
+    """
+    return _weighted(fitness, count, rng)
+
+
+def rank(fitness, count, rng=None):
+    """Selection proportionate to the rank, the worst chromosome has weight 1
+
+    Args:
+      fitness: fitness values of the population
+      count (int): number of indices to draw
+      rng: source of randomness with ``uniform`` and ``randrange``,
+        defaults to :func:`marslander.rng.default_random`
+
+    Returns:
+      list: selected indices
+    """
+    order = sorted(range(len(fitness)), key=fitness.__getitem__)
+    weights = [0] * len(order)
+    for position, idx in enumerate(order):
+        weights[idx] = position + 1
+    return _weighted(weights, count, rng)
+
+
+def tournament(fitness, count, size=2, rng=None):
+    """Best of ``size`` uniformly drawn chromosomes, ``count`` times
+
+    Args:
+      fitness: fitness values of the population
+      count (int): number of indices to draw
+      size (int): chromosomes competing in one tournament
+      rng: source of randomness with ``randrange``, defaults to
+        :func:`marslander.rng.default_random`
+
+    Returns:
+      list: selected indices
+    """
+    rng = rng or default_random()
+    population_size = len(fitness)
+    selected = []
+    for _ in range(count):
+        contestants = [rng.randrange(population_size) for _ in range(size)]
+        selected.append(max(contestants, key=fitness.__getitem__))
+    return selected
+
+
+def elites(fitness, count):
+    """Indices of the ``count`` fittest chromosomes, best first
+
+    Uses a partial selection, O(n log count), instead of sorting everything.
+    Ties keep the population order.
+    """
+    return heapq.nlargest(count, range(len(fitness)), key=fitness.__getitem__)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Persistent store of the best genomes found per scenario.
+
+Most games repeat a surface and initial state seen before, so the best
+genomes of a finished search are kept in SQLite. They are keyed on the
+solver, a hash of the surface points and the initial state quantized to
+``quantum``. A later run seeds its first population from them, or answers
+the first turn straight from the best one, instead of starting from random
+genomes.
+
+Every key keeps its ``genomes_per_key`` fittest genomes. Once the store
+holds more than ``max_entries`` genomes, the least recently used keys are
+evicted.
+"""
+from __future__ import division, print_function, absolute_import
+
+import json
+import time
+import sqlite3
+import hashlib
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS genomes (
+    solver TEXT NOT NULL,
+    surface TEXT NOT NULL,
+    state TEXT NOT NULL,
+    genome TEXT NOT NULL,
+    fitness REAL NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (solver, surface, state, genome)
+);
+CREATE INDEX IF NOT EXISTS genomes_used ON genomes (used);
+'''
+
+
+def surface_hash(surface):
+    """str: stable hash of the (x, y) points of a surface"""
+    points = ';'.join('{},{}'.format(x, y) for x, y in surface)
+    return hashlib.sha1(points.encode()).hexdigest()
+
+
+def quantize(state, quantum=1):
+    """str: ``state`` values rounded down to multiples of ``quantum``
+
+    Args:
+      state: initial state values
+      quantum: one step for all values or a step per value
+    """
+    if not isinstance(quantum, (tuple, list)):
+        quantum = (quantum,) * len(state)
+    return ','.join(str(int(value // step)) for value, step in zip(state, quantum))
+
+
+class SolutionStore(object):
+    """SQLite backed store of the fittest genomes per scenario
+
+    Args:
+      path (str): database file, ``':memory:'`` for a throwaway store
+      max_entries (int): genomes kept before least recently used keys are
+        evicted
+      genomes_per_key (int): fittest genomes kept per scenario
+      quantum: see :func:`quantize`
+    """
+
+    def __init__(self, path=':memory:', max_entries=10000, genomes_per_key=8, quantum=1):
+        assert 0 < genomes_per_key <= max_entries
+        self.path = path
+        self.max_entries = max_entries
+        self.genomes_per_key = genomes_per_key
+        self.quantum = quantum
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.executescript(_SCHEMA)
+
+    def key(self, surface, state):
+        """(surface hash, quantized state) of a scenario"""
+        return surface_hash(surface), quantize(state, self.quantum)
+
+    def get(self, solver, surface, state):
+        """Stored genomes of a scenario, fittest first
+
+        Args:
+          solver (str): solver name
+          surface: (x, y) surface points
+          state: initial state
+
+        Returns:
+          list: (genome, fitness) pairs, a genome is a list of gene lists
+        """
+        surface_key, state_key = self.key(surface, state)
+        with self._connection:
+            rows = self._connection.execute(
+                'SELECT genome, fitness FROM genomes WHERE solver = ? AND surface = ? AND state = ? '
+                'ORDER BY fitness DESC', (solver, surface_key, state_key)).fetchall()
+            if rows:
+                self._connection.execute(
+                    'UPDATE genomes SET used = ? WHERE solver = ? AND surface = ? AND state = ?',
+                    (time.time(), solver, surface_key, state_key))
+        return [(json.loads(genome), fitness) for genome, fitness in rows]
+
+    def put(self, solver, surface, state, genomes):
+        """Merge ``genomes`` into the scenario's fittest genomes
+
+        Args:
+          solver (str): solver name
+          surface: (x, y) surface points
+          state: initial state
+          genomes: (genome, fitness) pairs, a genome is a sequence of genes
+        """
+        surface_key, state_key = self.key(surface, state)
+        now = time.time()
+        rows = [(solver, surface_key, state_key, json.dumps([[int(value) for value in gene] for gene in genome]),
+                 float(fitness), now) for genome, fitness in genomes]
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO genomes (solver, surface, state, genome, fitness, used) '
+                'VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self._connection.execute(
+                'DELETE FROM genomes WHERE solver = ? AND surface = ? AND state = ? AND genome NOT IN '
+                '(SELECT genome FROM genomes WHERE solver = ? AND surface = ? AND state = ? '
+                'ORDER BY fitness DESC LIMIT ?)',
+                (solver, surface_key, state_key) * 2 + (self.genomes_per_key,))
+            self._evict()
+
+    def _evict(self):
+        excess = len(self) - self.max_entries
+        while excess > 0:
+            oldest = self._connection.execute(
+                'SELECT solver, surface, state, COUNT(*) FROM genomes GROUP BY solver, surface, state '
+                'ORDER BY MAX(used) LIMIT 1').fetchone()
+            self._connection.execute('DELETE FROM genomes WHERE solver = ? AND surface = ? AND state = ?',
+                                     oldest[:3])
+            excess -= oldest[3]
+
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM genomes').fetchone()[0]
+
+    def clear(self):
+        """Drop all genomes"""
+        with self._connection:
+            self._connection.execute('DELETE FROM genomes')
+
+    def close(self):
+        """Close the database"""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return 'SolutionStore({!r}, size={}/{})'.format(self.path, len(self), self.max_entries)
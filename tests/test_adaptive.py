@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+from marslander import rng
+from marslander.adaptive import AdaptiveController, relative_diversity
+from marslander.metrics import Metrics
+from marslander.marslander1 import solution as marslander1
+from marslander.marslander2 import solution as marslander2
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def test_relative_diversity():
+    assert relative_diversity([10., 10.]) == 0.
+    assert relative_diversity([1., 3.]) == pytest.approx(0.5)
+    assert relative_diversity([0., 0.5]) == pytest.approx(0.25)
+
+
+def test_stalled_search_explores():
+    controller = AdaptiveController(0.01, 20, stagnation=2)
+    controller.update(0, [1., 5., 9.])
+    assert (controller.mutation_chance, controller.population_size, controller.immigrants) == (0.01, 16, 0)
+    for generation in range(1, 4):
+        controller.update(generation, [1., 5., 9.])
+    assert controller.stagnant == 3
+    assert controller.mutation_chance == pytest.approx(0.04)
+    assert controller.population_size == 24
+    assert controller.immigrants == int(controller.immigrant_share * 24)
+    assert not controller.stop
+
+    controller.update(4, [1., 5., 12.])
+    assert controller.stagnant == 0
+    assert controller.immigrants == 0
+    assert controller.mutation_chance == pytest.approx(0.02)
+    assert controller.population_size == 20
+
+
+def test_converged_population_explores_and_sizes_stay_in_bounds():
+    controller = AdaptiveController(0.01, 20)
+    for generation in range(20):
+        controller.update(generation, [7.] * 10)
+    assert controller.diversity == 0.
+    assert controller.population_size == controller.max_population == 40
+    for generation in range(20, 40):
+        controller.update(generation, [1., generation])
+    assert controller.population_size == controller.min_population == 10
+
+
+def test_stable_landing_stops():
+    controller = AdaptiveController(0.01, 20, stable=3)
+    for generation in range(4):
+        controller.update(generation, [1., 100.], landed=False)
+    assert not controller.stop
+    controller = AdaptiveController(0.01, 20, stable=3)
+    for generation in range(4):
+        controller.update(generation, [1., 100.], landed=True)
+    assert controller.stop
+
+
+@pytest.mark.parametrize('solver', [marslander1, marslander2])
+def test_breed_sizes_mutation_and_immigrants(solver):
+    rng.seed(5)
+    population = solver.random_population()
+    fitness_array = [float(idx) for idx in range(len(population))]
+    children, parents = solver.breed(population, fitness_array, size=8, mutation_chance=0., immigrants=3)
+    assert len(children) == len(parents) == 8
+    children, parents = solver.breed(population, fitness_array, size=30, immigrants=40)
+    assert len(children) == len(parents) == 30
+    for child, parent in zip(children[:2], parents[:2]):
+        assert list(map(tuple, child)) == list(map(tuple, population[parent]))
+
+
+def test_evolve_stops_once_landing_is_stable():
+    metrics = Metrics()
+    controller = AdaptiveController(marslander1.MUTATION_CHANCE, marslander1.POPULATION_SIZE, stable=5)
+    best, _, _ = marslander1.plan(100, 1000, 0, 550, 0, rng=4, metrics=metrics, controller=controller)
+    assert marslander1.simulate_final(100, 1000, 0, 550, 0, best)[0][5] == marslander1.FlyState.LANDED
+    assert controller.stop
+    assert metrics.counters['early_stops'] == 1
+    assert metrics.counters['generations'] <= marslander1.GENERATION_COUNT
+
+
+class SizeRecorder(object):
+    def __init__(self):
+        self.sizes = []
+
+    def record(self, generation, fitness_array):
+        self.sizes.append(len(fitness_array))
+
+
+def test_evolve_follows_controller_population_size():
+    rng.seed(6)
+    recorder = SizeRecorder()
+    controller = AdaptiveController(marslander2.MUTATION_CHANCE, marslander2.POPULATION_SIZE, stagnation=1)
+    surface = marslander2.Surface([(0, 100), (4000, 150), (5500, 150), (6999, 800)])
+    scenario = (2500, 2700, 0, 0, 550, 0, 0, surface)
+    improvements = list(marslander2.evolve(*scenario, recorder=recorder, controller=controller))
+    assert improvements[-1][1] == pytest.approx(marslander2.fitness(*scenario, improvements[-1][0]))
+    assert recorder.sizes[0] == marslander2.POPULATION_SIZE
+    assert len(set(recorder.sizes)) > 1
+    assert all(controller.min_population <= size <= controller.max_population for size in recorder.sizes)
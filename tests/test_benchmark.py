@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+
+from marslander import benchmark
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def test_measure_repeats_until_duration():
+    units, seconds, calls = benchmark.measure(lambda: 3, 0.)
+    assert (units, calls) == (3, 1)
+    assert seconds >= 0
+
+
+def test_compare():
+    baseline = [{'solver': 's', 'scenario': 'flat', 'benchmark': 'steps', 'rate': 10.}]
+    results = [{'solver': 's', 'scenario': 'flat', 'benchmark': 'steps', 'rate': 25.},
+               {'solver': 's', 'scenario': 'cave', 'benchmark': 'steps', 'rate': 5.}]
+    assert benchmark.compare(baseline, results) == [('s', 'flat', 'steps', 10., 25., 2.5)]
+
+
+def test_main_writes_json(tmpdir, capsys):
+    output = str(tmpdir.join('bench.json'))
+    benchmark.main(['-d', '0', '--scenario', 'flat', '-o', output])
+    with open(output) as results_file:
+        report = json.load(results_file)
+    assert report['environment']['python']
+    results = report['results']
+    assert len(results) == len(benchmark.SOLVERS) * (len(benchmark.BENCHMARKS) + len(benchmark.STARTUP_BENCHMARKS))
+    assert all(result['rate'] > 0 for result in results)
+    benchmark.main(['-d', '0', '--solver', 'marslander1', '--scenario', 'flat', '--benchmark', 'breed',
+                    '--compare', output])
+    assert 'breed' in capsys.readouterr().out
+
+
+def test_marslander2_import_does_not_load_numpy():
+    seconds, numpy_loaded = benchmark.measure_import('marslander.marslander2.solution', repeat=1)
+    assert seconds > 0
+    assert not numpy_loaded
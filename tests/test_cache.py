@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+import pytest
+from marslander import rng
+from marslander.cache import FitnessCache
+from marslander.marslander1 import solution
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def test_lru_eviction_and_counters():
+    cache = FitnessCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert (cache.hits, cache.misses, len(cache)) == (2, 1, 2)
+    assert cache.hit_rate == pytest.approx(2 / 3)
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+def test_cached_evaluation_matches_uncached():
+    rng.seed(5)
+    scenario = (100, 2500, 0, 550, 0)
+    population = solution.random_population()
+    population[1] = population[0]
+    cache = FitnessCache()
+    expected = solution.evaluate_population(*scenario, population)
+    assert solution.evaluate_population(*scenario, population, cache) == pytest.approx(expected)
+    assert solution.evaluate_population(*scenario, population, cache) == pytest.approx(expected)
+    assert cache.misses == len(population)
+    assert cache.hits == len(population)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+from marslander import cli, scenarios
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+@pytest.fixture
+def sources(tmpdir):
+    terrains = tmpdir.mkdir('terrains')
+    terrains.join('b.txt').write('2\n0 100\n6999 100\n2500 2500 0 0 500 0 0\n')
+    terrains.join('a.txt').write('3\n0 100\n3500 100\n6999 900\n2000 2700 0 0 550 0 0\n')
+    terrains.join('notes.md').write('not a scenario')
+    manifest = tmpdir.join('nightly.jsonl')
+    manifest.write(json.dumps({'name': 'valley', 'surface': [[0, 500], [3000, 100], [4000, 100], [6999, 500]],
+                               'state': [3500, 2000, 0, 0, 400, 0, 0]}) + '\n\n' +
+                   json.dumps({'surface': [[0, 100], [6999, 100]], 'state': [100, 1000, 0, 0, 300, 0, 0]}) + '\n')
+    return [str(terrains), str(manifest), 'cave']
+
+
+def test_collect_scenarios(sources):
+    found = cli.collect_scenarios(sources)
+    assert [scenario.name for scenario in found] == ['a', 'b', 'valley', 'nightly-1', 'cave']
+    assert found[2].surface == ((0, 500), (3000, 100), (4000, 100), (6999, 500))
+    assert found[-1] is scenarios.SCENARIOS['cave']
+
+
+@pytest.mark.parametrize('solver', ['marslander1', 'marslander2'])
+def test_main_streams_json_lines(sources, tmpdir, solver):
+    output = tmpdir.join('results.jsonl')
+    assert cli.main(sources + ['--solver', solver, '-b', '0.05', '-j', '2', '--seed', '3', '-o', str(output)]) == 0
+    results = [json.loads(line) for line in output.read().splitlines()]
+    assert sorted(result['name'] for result in results) == ['a', 'b', 'cave', 'nightly-1', 'valley']
+    for result in results:
+        assert result['solver'] == solver
+        assert result['genome'] and result['final_state']['fly_state'] in ('LANDED', 'CRASHED', 'LOST', 'FLYING')
+        assert result['evaluations'] >= result['generations'] > 0
+        assert result['wall_time'] > 0
+
+
+def test_failed_scenario_reports_error():
+    broken = scenarios.Scenario('broken', ((0, 100),), (1, 2))
+    result = cli.solve('marslander2', broken, (1, ()), 0.01)
+    assert result['name'] == 'broken' and 'error' in result
+
+
+def test_store_seeds_next_sweep(tmpdir):
+    store = str(tmpdir.join('store.db'))
+    first = cli.solve('marslander1', scenarios.SCENARIOS['flat'], (1, ()), 0.05, store)
+    second = cli.solve('marslander1', scenarios.SCENARIOS['flat'], (2, ()), 0.05, store)
+    assert first['seeded'] == 0
+    assert second['seeded'] > 0
+    assert second['fitness'] >= first['fitness']
+
+
+def test_adaptive_search_stops_once_landed():
+    result = cli.solve('marslander1', scenarios.SCENARIOS['high_ground'], (1, ()), 0, adaptive=True)
+    fixed = cli.solve('marslander1', scenarios.SCENARIOS['high_ground'], (1, ()), 0)
+    assert result['landed']
+    assert result['generations'] < fixed['generations']
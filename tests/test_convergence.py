@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import csv
+
+import pytest
+from marslander import rng
+from marslander.convergence import FIELDS, ConvergenceRecorder
+from marslander.marslander1 import solution
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def test_record_statistics():
+    recorder = ConvergenceRecorder()
+    recorder.record(0, [1., 3.])
+    generation, elapsed, best, mean, diversity = recorder.rows[0]
+    assert (generation, best, mean, diversity) == (0, 3., 2., 1.)
+    assert elapsed >= 0
+
+
+def test_evolve_records_every_generation(tmpdir):
+    rng.seed(13)
+    recorder = ConvergenceRecorder()
+    improvements = list(solution.evolve(100, 2500, 0, 550, 0, recorder=recorder))
+    assert len(recorder) == solution.GENERATION_COUNT + 1
+    assert recorder.column('generation') == list(range(len(recorder)))
+    assert max(recorder.column('best')) == pytest.approx(improvements[-1][1])
+    assert recorder.column('time') == sorted(recorder.column('time'))
+
+    path = str(tmpdir.join('convergence.csv'))
+    recorder.write_csv(path)
+    with open(path) as csv_file:
+        rows = list(csv.reader(csv_file))
+    assert tuple(rows[0]) == FIELDS
+    assert len(rows) == len(recorder) + 1
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+from marslander import islands
+from marslander.marslander1 import solution
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+SCENARIO = (100, 2500, 0, 550, 0)
+
+
+def test_migration_routes():
+    assert islands.migration_routes(3, 'ring') == {0: [1], 1: [2], 2: [0]}
+    assert islands.migration_routes(3, 'full') == {0: [1, 2], 1: [0, 2], 2: [0, 1]}
+    assert islands.migration_routes(2, {0: [1]}) == {0: [1], 1: []}
+    with pytest.raises(ValueError):
+        islands.migration_routes(2, 'star')
+
+
+def test_run_islands_returns_best_of_all_islands():
+    best_chromosome, best_fitness, results = islands.run_islands(
+        solution, SCENARIO, islands=3, generations=6, migration_interval=2, topology='full', seed=1)
+    assert len(results) == 3
+    assert best_fitness == max(result[1] for result in results)
+    assert best_fitness == pytest.approx(solution.fitness(*SCENARIO, best_chromosome))
+
+    _, repeated_fitness, _ = islands.run_islands(solution, SCENARIO, islands=1, generations=6, seed=1)
+    _, single_fitness, _ = islands.run_islands(solution, SCENARIO, islands=1, generations=6, seed=1)
+    assert repeated_fitness == single_fitness
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+import numpy as np
+import pytest
+from marslander import rng
+from marslander.marslander1 import solution
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+SCENARIOS = [
+    (100, 2500, 0, 550, 0),
+    (150, 2800, -40, 1000, 2),
+    (1500, 2900, 20, 300, 4),
+]
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_final_states_match_scalar_trajectory(scenario):
+    rng.seed(1)
+    population = solution.random_population()
+    states = solution.calculate_final_states(*scenario, population)
+    for chromosome, state in zip(population, states):
+        last_state = solution.calculate_trajectory(*scenario, chromosome)[-1]
+        assert state[:5] == pytest.approx(last_state[:5])
+        assert state[5] == last_state[5].value
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_evaluate_population_matches_fitness(scenario):
+    rng.seed(2)
+    population = solution.random_population()
+    expected = [solution.fitness(*scenario, chromosome) for chromosome in population]
+    assert solution.evaluate_population(*scenario, population) == pytest.approx(np.array(expected))
+
+
+def test_genome_encoding_roundtrip():
+    commands = [(power % 5, 5 + power) for power in range(solution.COMMAND_COUNT)]
+    chromosome = solution.encode_chromosome(commands)
+    assert chromosome.dtype == solution.GENOME_DTYPE
+    assert solution.decode_chromosome(chromosome) == commands
+    replaced = solution.replace_command(chromosome, 3, (4, 20))
+    assert solution.decode_chromosome_idx(replaced, 3) == (4, 20)
+    assert solution.decode_chromosome_idx(chromosome, 3) == commands[3]
+
+
+def test_crossover_and_mutate_keep_genome_shape():
+    rng.seed(3)
+    chromosome1, chromosome2 = solution.random_population()[:2]
+    child1, child2 = solution.crossover(chromosome1, chromosome2)
+    for child in (child1, child2, solution.mutate(child1)):
+        assert child.shape == (solution.COMMAND_COUNT, 2)
+        assert np.all((solution.POWER_MIN <= child[:, 0]) & (child[:, 0] <= solution.POWER_MAX))
+        assert np.all((solution.TIME_MIN <= child[:, 1]) & (child[:, 1] <= solution.TIME_MAX))
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_simulate_final_matches_trajectory(scenario):
+    rng.seed(4)
+    for chromosome in solution.random_population():
+        trajectory = solution.calculate_trajectory(*scenario, chromosome)
+        last_state, steps = solution.simulate_final(*scenario, chromosome)
+        assert last_state == trajectory[-1]
+        assert steps == len(trajectory) - 1
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_resumed_checkpoints_match_full_simulation(scenario):
+    rng.seed(6)
+    parent_population = solution.random_population()
+    parent_checkpoints = solution.calculate_checkpoints(*scenario, parent_population, pruning=solution.PRUNING)
+    parents = np.arange(len(parent_population))[::-1]
+    population = np.array([solution.mutate(solution.crossover(parent_population[idx], parent_population[0])[0])
+                           for idx in parents])
+
+    fitness_array, checkpoints = solution.evaluate_generation(*scenario, population, parent_population, parents,
+                                                              parent_checkpoints)
+    assert checkpoints == pytest.approx(solution.calculate_checkpoints(*scenario, population,
+                                                                       pruning=solution.PRUNING))
+    assert fitness_array == pytest.approx(solution.evaluate_population(*scenario, population))
+
+
+def test_resumed_child_redecides_a_pruned_parent():
+    scenario = (100, 2500, 0, 500, 0)
+    parent_population = np.array([[[4, 18], [4, 9], [3, 9], [4, 18], [4, 17], [2, 18], [0, 5], [3, 16], [3, 18],
+                                   [4, 17]]], dtype=solution.GENOME_DTYPE)
+    population = parent_population.copy()
+    population[0, -2:] = [(3, 6), (4, 11)]
+    _, parent_checkpoints = solution.evaluate_generation(*scenario, parent_population)
+    assert parent_checkpoints[0, -1, 5] == solution.FlyState.CRASHED.value
+
+    fitness_array, checkpoints = solution.evaluate_generation(*scenario, population, parent_population,
+                                                              np.zeros(1, dtype=int), parent_checkpoints)
+    assert checkpoints[0, -1, 5] == solution.FlyState.FLYING.value
+    assert fitness_array[0] == pytest.approx(solution.fitness(*scenario, population[0]))
+
+
+def test_evolve_yields_improvements_until_deadline():
+    rng.seed(7)
+    deadline = solution.perf_counter() + 0.2
+    improvements = [fitness_value for _, fitness_value in solution.evolve(*SCENARIOS[0], deadline=deadline)]
+    assert improvements == sorted(improvements)
+    assert len(set(improvements)) == len(improvements)
+    assert solution.perf_counter() < deadline + 0.1
+
+
+def test_shift_population_drops_executed_step():
+    population = np.array([solution.encode_chromosome([(power, 1 + power) for power in range(solution.COMMAND_COUNT)])])
+    shifted = solution.shift_population(population)
+    assert shifted.shape == population.shape
+    assert solution.decode_chromosome_idx(shifted[0], 0) == (1, 2)
+    assert (shifted[0, :-1] == population[0, 1:]).all()
+    assert solution.TIME_MIN <= shifted[0, -1, 1] <= solution.TIME_MAX
+
+
+def test_plan_returns_warm_start_population():
+    rng.seed(8)
+    best_chromosome, best_fitness, population = solution.plan(*SCENARIOS[0])
+    assert population.shape == (solution.POPULATION_SIZE, solution.COMMAND_COUNT, 2)
+    assert best_fitness == pytest.approx(solution.fitness(*SCENARIOS[0], best_chromosome))
+    _, warm_fitness, _ = solution.plan(*SCENARIOS[0], population=population)
+    assert warm_fitness >= best_fitness
+
+
+def test_project_outcome_decides_hopeless_landers():
+    assert solution.project_outcome(100, 2900, 60, 0, 2)[0] > solution.HEIGHT_MAX
+    assert solution.project_outcome(100, 2900, 60, 0, 1) is None
+    position, speed = solution.project_outcome(100, 200, -80, 0, 2)
+    assert position < 100
+    assert speed <= -solution.LANDING_V_SPEED
+    assert solution.project_outcome(100, 200, -80, 0, 1) is None
+    assert solution.project_outcome(100, 2500, -40, 4, 100) is None
+    assert solution.project_outcome(100, 2500, -10, 0, 100) is None
+    states = np.array([[1, 2900, 60, 500, 0, 1], [1, 200, -80, 500, 0, 1], [1, 2500, -40, 500, 4, 1],
+                       [1, 200, -80, 500, 0, 1]], dtype=float)
+    projected = solution.project_states(100, states, np.array([2, 2, 100, 1]))
+    assert list(projected[:, 5]) == [solution.FlyState.CRASHED.value] * 2 + [solution.FlyState.FLYING.value] * 2
+    assert projected[1, 1:3] == pytest.approx((position, speed))
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_pruning_keeps_the_outcome(scenario):
+    rng.seed(9)
+    for chromosome in solution.random_population():
+        pruned_state, pruned_steps = solution.simulate_final(*scenario, chromosome, pruning=True)
+        state, steps = solution.simulate_final(*scenario, chromosome)
+        assert pruned_state[5] == state[5]
+        assert (pruned_state[1] > solution.HEIGHT_MAX) == (state[1] > solution.HEIGHT_MAX)
+        assert pruned_steps <= steps
+        if state[5] == solution.FlyState.LANDED:
+            assert pruned_state == state
+
+
+def test_trajectory_reports_the_simulated_crash():
+    chromosome = solution.encode_chromosome([(0, 20)] * solution.COMMAND_COUNT)
+    trajectory = solution.calculate_trajectory(100, 2500, 0, 550, 0, chromosome)
+    assert len(trajectory) == 37
+    assert trajectory[-1][1] < 100
+    assert trajectory[-1][2] == pytest.approx(36 * solution.GRAVITY)
+    assert solution.simulate_final(100, 2500, 0, 550, 0, chromosome) == (trajectory[-1], 36)
+    assert solution.simulate_final(100, 2500, 0, 550, 0, chromosome, pruning=True)[1] < 36
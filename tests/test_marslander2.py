@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import math
+
+import pytest
+from marslander import rng
+from marslander.marslander2 import solution
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+LANDING_ZONE = [(4000, 150), (5500, 150)]
+SCENARIO = (2500, 2700, 0, 0, 550, 0, 0, LANDING_ZONE)
+
+
+def test_step_updates_state_in_place():
+    state = solution.State(2500, 2700, 0, 0, 550, 0, 0, solution.FlyState.FLYING)
+    solution.step(state, 0, 4, LANDING_ZONE)
+    assert state.step == 2
+    assert state.power == 1
+    assert state.fuel == 549
+    assert state.v_speed == pytest.approx(solution.GRAVITY + 1)
+    assert state.y == pytest.approx(2700 + (solution.GRAVITY + 1) / 2)
+    assert state.fly_state == solution.FlyState.FLYING
+
+
+def test_step_follows_referee_physics():
+    state = solution.State(2500, 2700, 0, 0, 2, 15, 3, solution.FlyState.FLYING)
+    solution.step(state, 90, 4, LANDING_ZONE)
+    assert (state.angle, state.power, state.fuel) == (30, 2, 0)
+    assert state.h_speed == pytest.approx(-1)
+    assert state.v_speed == pytest.approx(solution.GRAVITY + 3 ** 0.5)
+    assert state.reported() == (2500, 2699, -1, -2, 0, 30, 2)
+
+    solution.step(state, 90, 4, LANDING_ZONE)
+    assert (state.power, state.fuel) == (0, 0)
+    assert state.h_speed == pytest.approx(-1)
+    assert state.reported() == (2499, 2695, -1, -6, 0, 45, 0)
+
+
+def test_thrust_table_matches_trigonometry():
+    for angle in (-90, -15, 0, 45, 90):
+        thrust_x, thrust_y = solution.THRUST[angle - solution.ROTATION_MIN][4]
+        assert thrust_x == pytest.approx(-4 * math.sin(math.radians(angle)))
+        assert thrust_y == pytest.approx(4 * math.cos(math.radians(angle)))
+    assert solution.referee_round(-2.5) == -2
+    assert solution.referee_round(2.5) == 3
+
+
+def test_final_state_matches_trajectory():
+    rng.seed(1)
+    trajectory = solution.Trajectory()
+    for chromosome in solution.random_population():
+        trajectory = solution.calculate_trajectory(*SCENARIO, chromosome, trajectory)
+        state, steps = solution.simulate_final(*SCENARIO, chromosome)
+        last_state = trajectory[-1]
+        assert state.step == last_state.step == len(trajectory) == steps + 1
+        for attribute in ('x', 'y', 'h_speed', 'v_speed', 'fuel', 'angle', 'power', 'fly_state'):
+            assert getattr(state, attribute) == getattr(last_state, attribute)
+
+
+def test_trajectory_index_out_of_range():
+    trajectory = solution.calculate_trajectory(*SCENARIO, [])
+    assert len(trajectory) == 1
+    with pytest.raises(IndexError):
+        trajectory[1]
+
+
+def test_get_best_trajectory_within_deadline():
+    rng.seed(2)
+    deadline = solution.perf_counter() + 0.2
+    trajectory = solution.get_best_trajectory(*SCENARIO, deadline=deadline)
+    assert solution.perf_counter() < deadline + 0.1
+    assert len(trajectory) > 1
+
+
+SURFACE = [(0, 100), (1000, 500), (1500, 1500), (3000, 1000), (4000, 150), (5500, 150), (6999, 800)]
+
+
+def test_surface_heights_and_intersections():
+    surface = solution.Surface(SURFACE)
+    assert surface.landing_zone == [(4000, 150), (5500, 150)]
+    assert surface.height(1250) == pytest.approx(1000)
+    assert surface.height(1250.5) == pytest.approx(1001)
+    assert surface.is_below(2000, 1200)
+    assert not surface.is_below(2000, 1400)
+    # both ends above the terrain, the step cuts through the peak at x=1500
+    contact = surface.intersect(1400, 1400, 1600, 1400)
+    assert contact == pytest.approx((1450, 1400))
+    assert surface.intersect(4500, 300, 4600, 200) is None
+    assert surface.intersect(4500, 200, 4600, 100) == pytest.approx((4550, 150))
+
+
+def test_step_collides_with_terrain():
+    surface = solution.Surface(SURFACE)
+    state = solution.State(1400, 1400, 200, 0, 500, 0, 0, solution.FlyState.FLYING)
+    solution.step(state, 0, 0, surface)
+    assert state.fly_state == solution.FlyState.CRASHED
+
+    state = solution.State(4500, 152, 0, -3, 500, 0, 0, solution.FlyState.FLYING)
+    solution.step(state, 0, 0, surface)
+    assert state.fly_state == solution.FlyState.LANDED
+
+    state = solution.State(4500, 152, 0, -3, 500, 15, 0, solution.FlyState.FLYING)
+    solution.step(state, 15, 0, surface)
+    assert state.fly_state == solution.FlyState.CRASHED
+
+    assert solution.evaluate_population(2500, 2700, 0, 0, 550, 0, 0, surface, solution.random_population()[:3],
+                                        solution.FitnessCache())
+
+
+def test_resumed_generation_matches_full_simulation():
+    rng.seed(12)
+    surface = solution.Surface(SURFACE)
+    scenario = (2500, 2700, 0, 0, 550, 0, 0, surface)
+    parent_population = solution.random_population()
+    parent_fitness, parent_trajectories = solution.evaluate_generation(*scenario, parent_population)
+    population, parents = solution.breed(parent_population, parent_fitness)
+    assert len(population) == solution.POPULATION_SIZE
+
+    fitness_array, trajectories = solution.evaluate_generation(*scenario, population, parent_population, parents,
+                                                               parent_trajectories)
+    assert fitness_array == solution.evaluate_population(*scenario, population)
+    for chromosome, trajectory in zip(population, trajectories):
+        expected = solution.calculate_trajectory(*scenario, chromosome, pruning=solution.PRUNING)
+        assert len(trajectory) == len(expected)
+        assert trajectory.y[:len(trajectory)] == expected.y[:len(expected)]
+
+
+def test_crossover_swaps_alternate_runs():
+    rng.seed(5)
+    chromosome1 = [(0, 0)] * 20
+    chromosome2 = [(15, 4)] * 20
+    child1, child2 = solution.crossover(chromosome1, chromosome2, points=2)
+    for gene1, gene2 in zip(child1, child2):
+        assert {gene1, gene2} == {(0, 0), (15, 4)}
+    assert chromosome1 == [(0, 0)] * 20
+
+
+def test_mutate_keeps_genes_valid():
+    rng.seed(6)
+    chromosome = [(0, 0)] * 50
+    assert solution.mutate(chromosome, chance=0.) is chromosome
+    mutated = solution.mutate(chromosome, chance=1.)
+    assert all(-90 <= rotation <= 90 and rotation % 15 == 0 for rotation, _ in mutated)
+    assert all(solution.POWER_MIN <= power <= solution.POWER_MAX for _, power in mutated)
+    changed = solution.mutate(chromosome, chance=0.1)
+    assert 0 < sum(gene != (0, 0) for gene in changed) < 50
+
+
+def test_prune_decides_hopeless_landers():
+    surface = solution.Surface(SURFACE)
+    assert (surface.floor, surface.top) == (min(y for _, y in SURFACE), max(y for _, y in SURFACE))
+
+    state = solution.State(2500, 500, 0, -60, 0, 0, 0, solution.FlyState.FLYING)
+    assert solution.prune(state, surface.floor, surface.top, 100)
+    assert state.fly_state == solution.FlyState.CRASHED
+    assert state.v_speed < -60
+
+    state = solution.State(2500, 2900, 0, 50, 500, 0, 0, solution.FlyState.FLYING)
+    assert solution.prune(state, surface.floor, surface.top, 100)
+    assert state.fly_state == solution.FlyState.LOST
+
+    for v_speed in (-10, -45):
+        state = solution.State(2500, 2700, 0, v_speed, 550, 0, 4, solution.FlyState.FLYING)
+        assert not solution.prune(state, surface.floor, surface.top, 100)
+        assert state.fly_state == solution.FlyState.FLYING
+
+    # out of genes before the impact, or drifting out of the zone first
+    for x, h_speed, remaining in ((2500, 0, 3), (200, -50, 100)):
+        state = solution.State(x, 500, h_speed, -60, 0, 0, 0, solution.FlyState.FLYING)
+        assert not solution.prune(state, surface.floor, surface.top, remaining)
+        assert state.fly_state == solution.FlyState.FLYING
+
+
+def test_pruning_keeps_the_outcome():
+    rng.seed(13)
+    surface = solution.Surface(SURFACE)
+    population = solution.random_population() + [[(0, 4)] * 30 + [(0, 3)] * 70]
+    for scenario in ((2500, 2700, 0, 0, 550, 0, 0, surface), (200, 2700, -100, -60, 550, 0, 0, surface)):
+        for chromosome in population:
+            pruned_state, pruned_steps = solution.simulate_final(*scenario, chromosome, pruning=True)
+            state, steps = solution.simulate_final(*scenario, chromosome)
+            assert pruned_state.fly_state == state.fly_state
+            assert pruned_steps <= steps
+            if state.fly_state == solution.FlyState.LANDED:
+                assert pruned_steps == steps
+
+
+def test_trajectory_reports_the_simulated_state():
+    surface = solution.Surface(SURFACE)
+    chromosome = [(0, 0)] * 100
+    trajectory = solution.calculate_trajectory(2500, 2700, 0, 0, 550, 0, 0, surface, chromosome)
+    state, steps = solution.simulate_final(2500, 2700, 0, 0, 550, 0, 0, surface, chromosome)
+    assert state.fly_state == trajectory[-1].fly_state == solution.FlyState.CRASHED
+    assert state.v_speed == trajectory[-1].v_speed
+    assert steps == len(trajectory) - 1
+    assert solution.simulate_final(2500, 2700, 0, 0, 550, 0, 0, surface, chromosome, pruning=True)[1] < steps
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+
+import pytest
+from marslander import rng
+from marslander.cache import FitnessCache
+from marslander.metrics import NULL_METRICS, Metrics, capture
+from marslander.marslander1 import solution
+from marslander.marslander2 import solution as solution2
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def test_null_metrics_discards():
+    with NULL_METRICS.timer('simulate'):
+        NULL_METRICS.count('evaluations', 3)
+    assert NULL_METRICS.snapshot() == {'timers': {}, 'counters': {}}
+
+
+def test_metrics_collects():
+    metrics = Metrics()
+    for _ in range(2):
+        with metrics.timer('simulate'):
+            metrics.count('evaluations', 3)
+    snapshot = metrics.snapshot()
+    assert snapshot['timers']['simulate']['calls'] == 2
+    assert snapshot['timers']['simulate']['seconds'] >= 0
+    assert snapshot['counters'] == {'evaluations': 6}
+    output = io.StringIO()
+    metrics.report(output)
+    assert 'simulate' in output.getvalue()
+    metrics.clear()
+    assert metrics.snapshot() == {'timers': {}, 'counters': {}}
+
+
+@pytest.mark.parametrize('solver, scenario', [
+    (solution, (100, 2500, 0, 550, 0)),
+    (solution2, (2500, 2700, 0, 0, 550, 0, 0, [(0, 100), (1000, 500), (1500, 100), (3000, 100), (6999, 100)])),
+])
+def test_evolve_reports_phases_without_printing(solver, scenario, capsys):
+    rng.seed(14)
+    metrics = Metrics()
+    cache = FitnessCache()
+    list(solver.evolve(*scenario, cache=cache, metrics=metrics))
+    snapshot = metrics.snapshot()
+    generations = solver.GENERATION_COUNT + 1
+    assert snapshot['counters']['generations'] == generations
+    assert snapshot['counters']['evaluations'] == generations * solver.POPULATION_SIZE
+    assert snapshot['counters']['cache_hits'] == cache.hits
+    assert 0 < snapshot['counters']['early_terminations'] <= snapshot['counters']['evaluations']
+    assert snapshot['timers']['simulate']['calls'] == generations
+    assert snapshot['timers']['select']['calls'] == snapshot['timers']['breed']['calls'] == generations - 1
+    assert capsys.readouterr() == ('', '')
+
+
+def test_capture():
+    with capture(profile=True, memory=True) as captured:
+        sorted(range(1000), key=lambda value: -value)
+    assert captured.profile is not None
+    assert captured.peak > 0
+    output = io.StringIO()
+    captured.report(output, limit=3)
+    assert 'peak traced memory' in output.getvalue()
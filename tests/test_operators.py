@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from marslander import operators
+from marslander.marslander1 import solution
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def test_crossover_swaps_runs_between_cut_points():
+    rng = np.random.default_rng(1)
+    parents1 = np.zeros((50, 10, 2), dtype=np.uint8)
+    parents2 = np.ones((50, 10, 2), dtype=np.uint8)
+    for points in (1, 3):
+        children1, children2 = operators.crossover(rng, parents1, parents2, points)
+        assert children1.dtype == np.uint8
+        assert (children1 + children2 == 1).all()
+        switches = np.abs(np.diff(children1[:, :, 0].astype(int), axis=1)).sum(axis=1)
+        assert switches.max() <= points
+        assert (children1[:, :, 0] == children1[:, :, 1]).all()
+
+
+def test_mutate_replaces_fields_with_chance():
+    rng = np.random.default_rng(2)
+    population = np.zeros((200, solution.COMMAND_COUNT, 2), dtype=np.uint8)
+    assert (operators.mutate(rng, population, 0., solution.random_genomes) == 0).all()
+    mutated = operators.mutate(rng, population, 0.5, solution.random_genomes)
+    changed = mutated[:, :, 1] != 0
+    assert abs(changed.mean() - 0.5) < 0.05
+    assert (mutated[:, :, 1][changed] >= solution.TIME_MIN).all()
+
+
+def test_next_generation_keeps_elites_first():
+    rng = np.random.default_rng(3)
+    population = solution.random_genomes(rng, 6)
+    children, parents = operators.next_generation(rng, population, [4, 1], [0, 2], [3, 5], 0.01,
+                                                  solution.random_genomes)
+    assert children.shape == (6, solution.COMMAND_COUNT, 2)
+    assert parents.tolist() == [4, 1, 0, 3, 2, 5]
+    assert (children[:2] == population[[4, 1]]).all()
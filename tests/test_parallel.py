@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+import pytest
+from marslander import rng
+from marslander.parallel import ParallelEvaluator
+from marslander.marslander1 import solution
+from marslander.marslander2 import solution as solution2
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+SCENARIO = (100, 2500, 0, 550, 0)
+
+
+def test_parallel_matches_serial_in_order():
+    rng.seed(9)
+    population = solution.random_population()
+    with ParallelEvaluator(solution.evaluate_population, SCENARIO, workers=3) as evaluator:
+        assert evaluator(population) == pytest.approx(solution.evaluate_population(*SCENARIO, population))
+        assert evaluator(population[:0]).shape == (0,)
+        evaluator.set_scenario((150, 2800, -40, 1000, 2))
+        assert evaluator(population[:2]) == pytest.approx(
+            solution.evaluate_population(150, 2800, -40, 1000, 2, population[:2]))
+
+
+def test_parallel_list_results_and_errors():
+    rng.seed(10)
+    scenario = (2500, 2700, 0, 0, 550, 0, 0, [(4000, 150), (5500, 150)])
+    population = solution2.random_population()[:5]
+    with ParallelEvaluator(solution2.evaluate_population, scenario, workers=2) as evaluator:
+        assert evaluator([]) == []
+        assert evaluator(population) == pytest.approx(solution2.evaluate_population(*scenario, population))
+        evaluator.set_scenario(())
+        with pytest.raises(TypeError):
+            evaluator(population)
+
+
+def test_evolve_with_evaluator_is_deterministic():
+    with ParallelEvaluator(solution.evaluate_population, workers=2) as evaluator:
+        results = []
+        for _ in range(2):
+            rng.seed(11)
+            best_chromosome, best_fitness, _ = solution.plan(*SCENARIO, evaluator=evaluator)
+            results.append((best_chromosome.tobytes(), best_fitness))
+    assert results[0] == results[1]
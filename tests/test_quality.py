@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+from marslander import quality
+from marslander.rng import SolverRandom
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def test_percentile():
+    assert quality.percentile([], 50) is None
+    assert quality.percentile([3.], 90) == 3.
+    assert quality.percentile([4., 1., 3., 2.], 50) == pytest.approx(2.5)
+    assert quality.percentile([1., 2., 3.], 100) == 3.
+
+
+def test_summarize():
+    runs = [{'landed': True, 'time_to_landing': 0.1, 'fuel': 300.},
+            {'landed': False, 'time_to_landing': None, 'fuel': None}]
+    summary = quality.summarize(runs)
+    assert (summary['count'], summary['landed'], summary['landing_rate']) == (2, 1, 0.5)
+    assert summary['fuel']['p50'] == 300.
+
+
+def test_run_once_reports_landing():
+    run = quality.run_once('marslander1', 'high_ground', SolverRandom(1), 0.2)
+    assert run['landed'] and run['fuel'] > 0
+    assert 0 <= run['time_to_landing'] <= 0.2 + 0.1
+
+
+def test_main_writes_report(tmpdir):
+    output = str(tmpdir.join('quality.json'))
+    convergence = str(tmpdir.join('convergence'))
+    quality.main(['-n', '2', '-b', '0.02', '--solver', 'marslander1', '--scenario', 'flat', '-o', output,
+                  '--convergence', convergence])
+    with open(output) as report_file:
+        results = json.load(report_file)['results']
+    assert [(result['solver'], result['scenario'], result['count']) for result in results] == \
+        [('marslander1', 'flat', 2)]
+    assert tmpdir.join('convergence', 'marslander1-flat-1.csv').check()
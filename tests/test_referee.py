@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+import types
+
+from marslander import referee, scenarios
+from marslander.marslander1 import solution
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+FLAT = scenarios.Scenario('flat', ((0, 100), (6999, 100)), (2500, 300, 0, 0, 500, 0, 0))
+
+
+def constant_solver(command):
+    def run(read, write):
+        for _ in range(int(read())):
+            read()
+        while True:
+            try:
+                read()
+            except EOFError:
+                return
+            write(command)
+    return types.SimpleNamespace(__name__='constant', run=run)
+
+
+def test_parse_command():
+    assert referee.parse_command('-15 3') == (-15, 3)
+    assert referee.parse_command('0 5') is None
+    assert referee.parse_command('up') is None
+    assert referee.parse_command(None) is None
+
+
+def test_free_fall_crashes_and_replays(tmpdir):
+    record = referee.play(FLAT, referee.InProcessPlayer(constant_solver('0 0')))
+    assert record['outcome'] == 'CRASHED'
+    assert record['turns'][0]['state'] == [2500, 300, 0, 0, 500, 0, 0]
+    assert record['missed_deadlines'] == 0
+    assert record['max_latency'] < referee.FIRST_TURN_TIME
+
+    path = str(tmpdir.join('game.json'))
+    referee.save_game(record, path)
+    assert referee.replay(referee.load_game(path)) == ('CRASHED', [])
+    record['turns'][1]['state'][1] += 1
+    assert referee.replay(record) == ('CRASHED', [1])
+
+
+def test_invalid_command_and_strict_deadline():
+    assert referee.play(FLAT, referee.InProcessPlayer(constant_solver('0 9')))['outcome'] == 'INVALID'
+    record = referee.play(FLAT, referee.InProcessPlayer(constant_solver('0 0')), first_turn_time=0., strict=True)
+    assert record['outcome'] == 'TIMEOUT'
+    assert record['missed_deadlines'] == len(record['turns']) == 1
+
+
+def test_subprocess_player():
+    script = 'import sys\nfor line in sys.stdin:\n    print("0 4")'
+    player = referee.SubprocessPlayer([sys.executable, '-c', script])
+    record = referee.play(FLAT, player, max_turns=3)
+    assert record['outcome'] == 'LOST'
+    assert [turn['command'] for turn in record['turns']] == ['0 4'] * 3
+
+
+def test_load_scenario(tmpdir):
+    assert referee.load_scenario('cave') is scenarios.SCENARIOS['cave']
+    path = tmpdir.join('valley.txt')
+    path.write('3\n0 100\n3500 100\n6999 800\n2500 2700 0 0 550 0 0\n')
+    assert referee.load_scenario(str(path)) == scenarios.Scenario(
+        'valley', ((0, 100), (3500, 100), (6999, 800)), (2500, 2700, 0, 0, 550, 0, 0))
+
+
+def test_solver_run_ends_at_eof():
+    lines = iter(['2', '0 100', '6999 100', '2500 2700 0 0 550 0 0'])
+    written = []
+
+    def read():
+        try:
+            return next(lines)
+        except StopIteration:
+            raise EOFError
+
+    solution.run(read, written.append)
+    assert len(written) == 1 and written[0].startswith('0 ')
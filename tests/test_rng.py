@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+
+import pytest
+from marslander import rng
+from marslander.rng import SolverRandom
+from marslander.marslander1 import solution
+from marslander.marslander2 import solution as solution2
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def test_same_seed_same_streams():
+    first, second = SolverRandom(42), SolverRandom(42)
+    assert [first.random() for _ in range(5)] == [second.random() for _ in range(5)]
+    assert (first.generator.integers(0, 100, 10) == second.generator.integers(0, 100, 10)).all()
+    assert SolverRandom(42).random() != SolverRandom(43).random()
+
+
+def test_spawned_streams_are_independent_and_reproducible():
+    parent = SolverRandom(7)
+    children = parent.spawn(3)
+    draws = [child.random() for child in children]
+    assert len(set(draws)) == 3
+    assert [child.spawn_key for child in parent.spawn(2)] == [(3,), (4,)]
+    assert [child.random() for child in SolverRandom(7).spawn(3)] == draws
+    assert SolverRandom(*children[1].state).random() == SolverRandom(7, (1,)).random()
+
+
+def test_pickle_keeps_position():
+    stream = SolverRandom(3)
+    stream.random()
+    copy = pickle.loads(pickle.dumps(stream))
+    assert copy.state == stream.state
+    assert copy.random() == stream.random()
+
+
+def test_default_stream_reseeding():
+    rng.seed(11)
+    expected = rng.default_random().random()
+    rng.seed(11)
+    assert rng.default_random().random() == expected
+
+
+@pytest.mark.parametrize('solver, scenario', [
+    (solution, (100, 2500, 0, 550, 0)),
+    (solution2, (2500, 2700, 0, 0, 550, 0, 0, [(0, 100), (1000, 500), (1500, 100), (3000, 100), (6999, 100)])),
+])
+def test_evolve_replays_from_seed(solver, scenario):
+    runs = [list(solver.evolve(*scenario, rng=5)) for _ in range(2)]
+    assert [fitness for _, fitness in runs[0]] == [fitness for _, fitness in runs[1]]
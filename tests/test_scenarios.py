@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+from marslander import scenarios
+from marslander.marslander1 import solution
+from marslander.marslander2 import solution as solution2
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+
+def test_landing_height():
+    assert scenarios.landing_height([(0, 100), (1000, 500), (1500, 100), (3000, 100)]) == 100
+    assert scenarios.landing_height([(0, 100), (1000, 500)]) == 0
+
+
+@pytest.mark.parametrize('name', sorted(scenarios.SCENARIOS))
+def test_scenarios_run_in_both_solvers(name):
+    scenario = scenarios.SCENARIOS[name]
+    assert scenario.name == name
+    assert scenario.surface[0][0] == 0 and scenario.surface[-1][0] == 6999
+    arguments = scenarios.marslander1_arguments(scenario)
+    assert arguments[0] > 0
+    assert len(solution.evaluate_population(*arguments, solution.random_population())) == solution.POPULATION_SIZE
+    arguments = scenarios.marslander2_arguments(scenario)
+    assert len(solution2.calculate_trajectory(*arguments, solution2.random_population()[0])) > 1
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import random
+from collections import Counter
+
+import pytest
+from marslander import selection
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+FITNESS = [1., 0., 3., -5., 6.]
+
+
+def test_roulette_is_fitness_proportionate():
+    rng = random.Random(1)
+    counts = Counter(selection.roulette(FITNESS, 10000, rng))
+    assert set(counts) == {0, 2, 4}
+    assert counts[4] / 10000 == pytest.approx(0.6, abs=0.03)
+    assert counts[0] / 10000 == pytest.approx(0.1, abs=0.03)
+
+
+def test_roulette_without_positive_fitness_is_uniform():
+    assert set(selection.roulette([0, -1, 0], 300, random.Random(2))) == {0, 1, 2}
+
+
+def test_rank_and_tournament_prefer_fitter():
+    rng = random.Random(3)
+    counts = Counter(selection.rank(FITNESS, 15000, rng))
+    assert counts[4] > counts[2] > counts[0] > counts[1] > counts[3] > 0
+    assert selection.tournament(FITNESS, 50, size=len(FITNESS) * 20, rng=rng) == [4] * 50
+    assert len(selection.tournament(FITNESS, 7, rng=rng)) == 7
+
+
+def test_elites_partial_selection():
+    assert selection.elites(FITNESS, 2) == [4, 2]
+    assert selection.elites([1, 2, 2, 0], 2) == [1, 2]
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+from marslander import rng
+from marslander.store import SolutionStore, quantize, surface_hash
+from marslander.marslander1 import solution
+from marslander.marslander2 import solution as solution2
+
+__author__ = "Marek Takac"
+__copyright__ = "Marek Takac"
+__license__ = "none"
+
+SURFACE = ((0, 100), (6999, 100))
+STATE = (2500, 2500, 0, 0, 500, 0, 0)
+
+
+def test_keys():
+    assert surface_hash(SURFACE) == surface_hash([[0, 100], [6999, 100]])
+    assert surface_hash(SURFACE) != surface_hash(((0, 100), (6999, 101)))
+    assert quantize((2504, -3, 7), 10) == '250,-1,0'
+    assert quantize((2504, -3, 7), (1, 1, 5)) == '2504,-3,1'
+
+
+def test_keeps_fittest_genomes_per_key(tmpdir):
+    path = str(tmpdir.join('store.db'))
+    with SolutionStore(path, genomes_per_key=2) as store:
+        store.put('s', SURFACE, STATE, [([[1, 5]], 1.), ([[2, 5]], 3.), ([[3, 5]], 2.)])
+        store.put('s', SURFACE, STATE, [([[1, 5]], 1.5)])
+        assert store.get('s', SURFACE, STATE) == [([[2, 5]], 3.), ([[3, 5]], 2.)]
+        assert store.get('other', SURFACE, STATE) == []
+    with SolutionStore(path, genomes_per_key=2) as store:
+        assert len(store) == 2
+
+
+def test_evicts_least_recently_used():
+    store = SolutionStore(max_entries=3, genomes_per_key=2)
+    for height in (100, 200, 300):
+        store.put('s', ((0, height), (6999, height)), STATE, [([[1, 5]], 1.), ([[2, 5]], 2.)])
+    assert len(store) <= 3
+    assert store.get('s', ((0, 300), (6999, 300)), STATE)
+    assert not store.get('s', ((0, 100), (6999, 100)), STATE)
+    store.clear()
+    assert len(store) == 0
+
+
+@pytest.mark.parametrize('solver, command', [
+    (solution, lambda gene: '0 {}'.format(gene[0])),
+    (solution2, lambda gene: '{} {}'.format(*gene)),
+])
+def test_run_seeds_from_store(solver, command):
+    lines = ['2', '0 100', '6999 100', ' '.join(str(value) for value in STATE)]
+    store = SolutionStore()
+
+    def play(instant=False):
+        remaining = iter(lines)
+        written = []
+
+        def read():
+            try:
+                return next(remaining)
+            except StopIteration:
+                raise EOFError
+        solver.run(read, written.append, store, instant)
+        return written
+
+    rng.seed(15)
+    first = play()
+    stored = store.get(solver.SOLVER_NAME, SURFACE, STATE)
+    assert 0 < len(stored) <= store.genomes_per_key
+    assert play(instant=True) == [command(stored[0][0][0])]
+    assert len(first) == 1
+    population = solver.seed_population([genome for genome, _ in stored])
+    assert len(population) == solver.POPULATION_SIZE
+    assert [[int(value) for value in gene] for gene in population[0]] == stored[0][0]